@@ -79,7 +79,7 @@ async def run_async_migrations() -> None:
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
-        connect_args={"ssl": True},
+        connect_args={"ssl": app_core_config.db_ssl},
     )
 
     async with connectable.connect() as connection:
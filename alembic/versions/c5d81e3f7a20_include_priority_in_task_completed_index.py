@@ -0,0 +1,31 @@
+"""include priority in task completed index
+
+Revision ID: c5d81e3f7a20
+Revises: afa043eef46b
+Create Date: 2026-10-17 07:24:51.208316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d81e3f7a20'
+down_revision: Union[str, Sequence[str], None] = 'afa043eef46b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_task_owner_id_completed_due_date', table_name='task')
+    op.create_index('ix_task_owner_id_completed_due_date', 'task', ['owner_id', 'completed', 'due_date'], unique=False, postgresql_include=['priority'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_owner_id_completed_due_date', table_name='task', postgresql_include=['priority'])
+    op.create_index('ix_task_owner_id_completed_due_date', 'task', ['owner_id', 'completed', 'due_date'], unique=False)
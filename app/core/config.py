@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import (
     AnyUrl,
@@ -27,10 +27,15 @@ class Settings(BaseSettings):
     )
 
     pg_host: str
+    pg_port: int = 5432
     pg_database: str
     pg_user: str
     pg_password: str
 
+    # Optional replica of the same database, for handlers that only read
+    pg_replica_host: str | None = None
+    pg_replica_port: int | None = None
+
     @computed_field
     @property
     def sqlalchemy_database_uri(self) -> PostgresDsn:
@@ -39,9 +44,42 @@ class Settings(BaseSettings):
             username=self.pg_user,
             password=self.pg_password,
             host=self.pg_host,
+            port=self.pg_port,
             path=self.pg_database,
         )
 
+    @computed_field
+    @property
+    def sqlalchemy_replica_database_uri(self) -> PostgresDsn | None:
+        if self.pg_replica_host is None:
+            return None
+
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            username=self.pg_user,
+            password=self.pg_password,
+            host=self.pg_replica_host,
+            port=self.pg_replica_port or self.pg_port,
+            path=self.pg_database,
+        )
+
+    db_echo: bool = False
+    db_ssl: bool = True
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_warmup: int = 2
+    # Opt-in check of the statements each request runs, for development and tests
+    db_query_budget_mode: Literal["off", "log", "raise"] = "off"
+    db_query_budget: int = 10
+    db_query_budget_max_repeats: int = 3
+    # How long reads of a user who just wrote stay on the primary
+    db_replica_sticky_seconds: float = 5
+    db_replica_sticky_max_users: int = 10000
+    db_listen_reconnect_seconds: float = 5
+
     cors_origins: Annotated[list[AnyUrl] | str, BeforeValidator(parse_cors)] = []
 
     @computed_field
@@ -52,5 +90,23 @@ class Settings(BaseSettings):
     secret_key: str
     access_token_expire_minutes: int
 
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+    # Also bounds how stale the views relative to now, like upcomming, can get
+    response_cache_size: int = 1024
+    response_cache_ttl_seconds: float = 30
+    coalesce_reads: bool = True
+
+    password_hash_max_workers: int = 2
+
+    tasks_bulk_max_items: int = 1000
+    tasks_export_batch_size: int = 1000
+    tasks_import_batch_size: int = 5000
+    tasks_import_max_errors: int = 100
+    # How far back the change feed cursor stays, for rows committed out of order
+    tasks_changes_lag_seconds: float = 10
+    tasks_events_keepalive_seconds: float = 15
+    tasks_events_max_seconds: float = 300
+
 
 config = Settings.model_validate({})
@@ -1,7 +1,109 @@
-from sqlalchemy.ext.asyncio import create_async_engine
+import asyncio
+import time
+import uuid
+from typing import Any
 
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.core.cache import TTLCache
 from app.core.config import config
+from app.core.metrics import (
+    db_pool_checked_out,
+    db_pool_checkout_seconds,
+    record_query,
+)
+from app.core.query_budget import record_statement
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - start)
+
+
+def on_checkout(*_args: object) -> None:
+    db_pool_checked_out.inc()
+
+
+def on_checkin(*_args: object) -> None:
+    db_pool_checked_out.dec()
+
+
+def on_before_cursor_execute(
+    conn: Connection, _cursor: object, statement: str, *_args: object
+) -> None:
+    record_statement(statement)
+    # A connection runs one statement at a time, and the start of one that
+    # failed is overwritten by the next, so nothing piles up in `conn.info`
+    conn.info["query_start"] = time.perf_counter()
+
 
-engine = create_async_engine(
-    str(config.sqlalchemy_database_uri), echo=True, connect_args={"ssl": True}
+def on_after_cursor_execute(conn: Connection, *_args: object) -> None:
+    record_query(time.perf_counter() - conn.info.pop("query_start"))
+
+
+def create_engine(
+    url: str, *, execution_options: dict[str, Any] | None = None
+) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=config.db_echo,
+        connect_args={"ssl": config.db_ssl},
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+        execution_options=execution_options or {},
+    )
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    event.listen(engine.sync_engine, "checkin", on_checkin)
+    event.listen(engine.sync_engine, "before_cursor_execute", on_before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", on_after_cursor_execute)
+
+    return engine
+
+
+def create_replica_engine() -> AsyncEngine | None:
+    """Engine of the replica set by `PG_REPLICA_*`, if any."""
+    if config.sqlalchemy_replica_database_uri is None:
+        return None
+
+    # Read-only transactions, so that a handler routed there by mistake fails
+    # fast even when the replica is not a hot standby
+    return create_engine(
+        str(config.sqlalchemy_replica_database_uri),
+        execution_options={"postgresql_readonly": True},
+    )
+
+
+engine = create_engine(str(config.sqlalchemy_database_uri))
+replica_engine = create_replica_engine()
+
+# Users who committed within `db_replica_sticky_seconds`, so that they read their
+# own writes while the replica catches up. Marked by the commits of this worker,
+# and by the NOTIFY of those of the others.
+recent_writers: TTLCache[uuid.UUID, bool] = TTLCache(
+    maxsize=config.db_replica_sticky_max_users, ttl=config.db_replica_sticky_seconds
 )
+
+
+async def warm_up_pool(engine: AsyncEngine, size: int) -> None:
+    """Open `size` connections up front so early requests skip the handshake."""
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(size)), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, AsyncConnection):
+            await result.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
@@ -0,0 +1,50 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+from sqlalchemy import Select, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+async def query_etag(session: AsyncSession, query: Select[Any], *parts: object) -> str:
+    """Strong ETag for the rows of `query`, from their count and last `updated_at`.
+
+    Inserts and updates raise the last `updated_at` and deletes lower the count,
+    so any change to the rows yields a new tag without loading them.
+    """
+    rows = query.subquery()
+    results = await session.exec(select(func.count(), func.max(rows.c.updated_at)))
+    count, updated_at = results.one()
+
+    return make_etag(*parts, count, updated_at)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison, so `W/` prefixes are ignored
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def with_body_etag(request: Request, response: Response) -> Response:
+    """Tag `response` with a hash of its body, or replace it by a 304."""
+    etag = make_etag(response.body)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    return response
@@ -0,0 +1,173 @@
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Set by `entrypoint.sh`, so that every worker writes its samples to files
+# there and `/metrics` can report the sum across workers
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+db_pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+
+password_hash_queue_depth = Gauge(
+    "password_hash_queue_depth",
+    "Password hashes and verifications submitted and not done yet.",
+    multiprocess_mode="livesum",
+)
+password_hash_waiting = Gauge(
+    "password_hash_waiting",
+    "Password hashes and verifications waiting for a free thread.",
+    multiprocess_mode="livesum",
+)
+
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+http_requests_total = Counter(
+    "http_requests_total",
+    "Handled requests, by route template and response status.",
+    ["method", "route", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, by route template.",
+    ["method", "route"],
+    buckets=REQUEST_BUCKETS,
+)
+http_request_db_statements = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed while handling a request, by route template.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50, 100),
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements while handling a request.",
+    ["method", "route"],
+    buckets=REQUEST_BUCKETS,
+)
+user_cache_requests_total = Counter(
+    "user_cache_requests_total",
+    "Lookups of the authenticated user cache, by hit or miss.",
+    ["result"],
+)
+response_cache_requests_total = Counter(
+    "response_cache_requests_total",
+    "Lookups of the response cache, by route template and hit or miss.",
+    ["route", "result"],
+)
+
+coalesced_requests_total = Counter(
+    "coalesced_requests_total",
+    "Reads served by an identical read already in flight, by endpoint.",
+    ["endpoint"],
+)
+
+change_event_streams = Gauge(
+    "change_event_streams",
+    "Open streams of change events.",
+    multiprocess_mode="livesum",
+)
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    seconds: float = 0
+
+
+# Statements run by the engine add up into the stats of the current request
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def record_query(seconds: float) -> None:
+    stats = query_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += seconds
+
+
+class MetricsMiddleware:
+    """Record latency, status and SQL statements of each HTTP request.
+
+    Requests are labelled by the template of the route they matched, like
+    `/tasks/{task_id}`, so that the label values stay bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            query_stats.reset(token)
+
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            template = getattr(route, "path_format", "unmatched")
+            http_requests_total.labels(method, template, status_code).inc()
+            http_request_duration_seconds.labels(method, template).observe(duration)
+            http_request_db_statements.labels(method, template).observe(
+                stats.statements
+            )
+            http_request_db_seconds.labels(method, template).observe(stats.seconds)
+
+
+def render_metrics() -> bytes:
+    if not MULTIPROCESS:
+        return generate_latest()
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def mark_worker_dead() -> None:
+    # Drops this worker's live gauges, so they stop counting towards the sums
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
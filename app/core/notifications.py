@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager, suppress
+
+import asyncpg
+
+from app.core.config import config
+from app.core.db import recent_writers
+from app.core.metrics import change_event_streams
+from app.core.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Sent by each commit of a user's writes, with the user id as payload
+CHANGES_CHANNEL = "changes"
+
+CHANGES_EVENT = "event: changes\ndata: {}\n\n"
+KEEPALIVE_COMMENT = ": keepalive\n\n"
+
+
+class ChangeListener:
+    """Fans the NOTIFY events of the changes channel out to the subscribers of
+    this worker, over a single LISTEN connection.
+
+    Events only tell that something of a user changed, and clients read what
+    from the change feed. So several events before a subscriber is woken up
+    count as one, and all subscribers are woken up after a reconnect, as they
+    may have missed some. Events also invalidate the user's cached responses,
+    and keep their reads on the primary, as writes in other workers would
+    otherwise leave them stale.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: defaultdict[uuid.UUID, set[asyncio.Event]] = defaultdict(set)
+        self.closed = False
+        self.task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self.closed = False
+        self.task = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        self.closed = True
+        self.wake_all()
+        if self.task is not None:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                connection = await asyncpg.connect(
+                    host=config.pg_host,
+                    port=config.pg_port,
+                    user=config.pg_user,
+                    password=config.pg_password,
+                    database=config.pg_database,
+                    ssl=config.db_ssl,
+                )
+            except Exception as e:
+                logger.warning("Could not connect to listen for changes: %s", e)
+                await asyncio.sleep(config.db_listen_reconnect_seconds)
+                continue
+
+            # Nothing may end this task, or the worker would stop delivering
+            # events and invalidating caches until it restarts
+            try:
+                await self.listen_until_lost(connection)
+                logger.warning("Lost the connection listening for changes")
+            except Exception:
+                logger.exception("Failed listening for changes")
+            finally:
+                connection.terminate()
+
+            await asyncio.sleep(config.db_listen_reconnect_seconds)
+
+    async def listen_until_lost(self, connection: asyncpg.Connection) -> None:
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _connection: lost.set())
+        await connection.add_listener(CHANGES_CHANNEL, self.on_notification)
+        response_cache.clear()
+        self.wake_all()
+        await lost.wait()
+
+    def on_notification(
+        self,
+        _connection: asyncpg.Connection,
+        _pid: int,
+        _channel: str,
+        payload: str,
+    ) -> None:
+        try:
+            owner_id = uuid.UUID(payload)
+        except ValueError:
+            return
+
+        recent_writers.set(owner_id, True)
+        response_cache.bump(owner_id)
+        for changed in self.subscribers.get(owner_id, ()):
+            changed.set()
+
+    def wake_all(self) -> None:
+        for subscribers in self.subscribers.values():
+            for changed in subscribers:
+                changed.set()
+
+    @contextmanager
+    def subscribe(self, owner_id: uuid.UUID) -> Iterator[asyncio.Event]:
+        changed = asyncio.Event()
+        self.subscribers[owner_id].add(changed)
+        change_event_streams.inc()
+        try:
+            yield changed
+        finally:
+            change_event_streams.dec()
+            subscribers = self.subscribers[owner_id]
+            subscribers.discard(changed)
+            if not subscribers:
+                del self.subscribers[owner_id]
+
+
+change_listener = ChangeListener()
+
+
+async def stream_change_events(owner_id: uuid.UUID) -> AsyncIterator[str]:
+    """Server-sent events for the changes of `owner_id`.
+
+    Streams end after `tasks_events_max_seconds`, so that workers can shut
+    down, and clients reconnect.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config.tasks_events_max_seconds
+    with change_listener.subscribe(owner_id) as changed:
+        # Sent once subscribed, so that syncing on each event misses no change
+        yield CHANGES_EVENT
+        while not change_listener.closed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+
+            try:
+                async with asyncio.timeout(
+                    min(remaining, config.tasks_events_keepalive_seconds)
+                ):
+                    await changed.wait()
+            except TimeoutError:
+                # Also finds out about clients that went away
+                yield KEEPALIVE_COMMENT
+                continue
+
+            changed.clear()
+            if not change_listener.closed:
+                yield CHANGES_EVENT
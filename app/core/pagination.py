@@ -0,0 +1,22 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, id: uuid.UUID) -> str:
+    payload = json.dumps([sort_value.isoformat(), str(id)], separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, id = json.loads(base64.urlsafe_b64decode(padded))
+
+        return datetime.fromisoformat(sort_value), uuid.UUID(id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,102 @@
+import logging
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Request
+
+from app.core.config import config
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_ATTRIBUTE = "query_budget"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def statement_shape(statement: str) -> str:
+    """`statement` with its parameters, IN lists and VALUES rows collapsed."""
+    shape = " ".join(statement.split())
+    shape = re.sub(r"\$\d+(?:::[\w\[\]]+)?", "?", shape)
+    shape = re.sub(r"\?(?:, \?)+", "?", shape)
+    return re.sub(r"(\([^()]*\))(?:, \1)+", r"\1", shape)
+
+
+@dataclass
+class QueryCounter:
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated_shapes(self, min_repeats: int = 2) -> dict[str, int]:
+        shapes = Counter(statement_shape(statement) for statement in self.statements)
+        return {shape: n for shape, n in shapes.items() if n >= min_repeats}
+
+
+# Every statement run by the engine is added to all the active counters
+query_counters: ContextVar[tuple[QueryCounter, ...]] = ContextVar(
+    "query_counters", default=()
+)
+
+
+def record_statement(statement: str) -> None:
+    for counter in query_counters.get():
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count the statements run inside the block, including by requests
+    handled in it, e.g. to pin the query count of an endpoint in a test:
+
+        with count_queries() as queries:
+            response = await client.get("/tasks/")
+        assert queries.count == 2
+    """
+    counter = QueryCounter()
+    token = query_counters.set((*query_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        query_counters.reset(token)
+
+
+def query_budget[F: Callable[..., Any]](statements: int) -> Callable[[F], F]:
+    """Declare how many statements a route may run, instead of the default
+    `db_query_budget`. Only checked when `db_query_budget_mode` is not `off`."""
+
+    def decorate(endpoint: F) -> F:
+        setattr(endpoint, QUERY_BUDGET_ATTRIBUTE, statements)
+        return endpoint
+
+    return decorate
+
+
+def check_query_budget(request: Request, counter: QueryCounter) -> None:
+    route = request.scope.get("route")
+    budget = getattr(
+        getattr(route, "endpoint", None), QUERY_BUDGET_ATTRIBUTE, config.db_query_budget
+    )
+    # The same statement run again and again is the mark of an N+1
+    repeated = counter.repeated_shapes(config.db_query_budget_max_repeats + 1)
+    if counter.count <= budget and not repeated:
+        return
+
+    message = (
+        f"{request.method} {getattr(route, 'path_format', request.url.path)} ran "
+        f"{counter.count} statements, with a budget of {budget}"
+    )
+    for shape, repeats in repeated.items():
+        message += f"\n  {repeats}x {shape}"
+
+    if config.db_query_budget_mode == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
@@ -0,0 +1,49 @@
+import codecs
+import csv
+from collections.abc import AsyncIterable, AsyncIterator
+
+MAX_LINE_LENGTH = 1024 * 1024
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines, holding one line at a time."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ValueError("Line too long")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def iter_csv_rows(lines: AsyncIterable[str]) -> AsyncIterator[dict[str, str]]:
+    """Parse CSV lines with a header row into dicts.
+
+    Lines are buffered until their quotes balance, so quoted fields may span
+    several lines.
+    """
+    header: list[str] | None = None
+    record: list[str] = []
+    async for line in lines:
+        record.append(line)
+        if sum(part.count('"') for part in record) % 2:
+            if sum(len(part) for part in record) > MAX_LINE_LENGTH:
+                raise ValueError("Line too long")
+            continue
+
+        text, record = "\n".join(record), []
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = values
+            continue
+
+        yield dict(zip(header, values, strict=False))
@@ -0,0 +1,81 @@
+import itertools
+import uuid
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+
+from app.core.cache import TTLCache
+from app.core.config import config
+from app.core.etag import is_not_modified, not_modified
+from app.core.metrics import response_cache_requests_total
+
+type ResponseCacheKey = tuple[uuid.UUID, int, str, str]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+
+
+class ResponseCache:
+    """Responses of list endpoints, per owner, route and query parameters.
+
+    Keys hold the owner's version, which writes bump, so that a write makes all
+    the cached responses of its owner unreachable, to be evicted as the least
+    recently used. Versions come from one counter, so that one forgotten and
+    then handed out again never matches the responses of an older one.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.responses: TTLCache[ResponseCacheKey, CachedResponse] = TTLCache(
+            maxsize=maxsize, ttl=ttl
+        )
+        self.versions: TTLCache[uuid.UUID, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.counter = itertools.count()
+
+    def version(self, owner_id: uuid.UUID) -> int:
+        version = self.versions.get(owner_id)
+        if version is None:
+            version = next(self.counter)
+            self.versions.set(owner_id, version)
+
+        return version
+
+    def bump(self, owner_id: uuid.UUID) -> None:
+        self.versions.set(owner_id, next(self.counter))
+
+    def clear(self) -> None:
+        self.versions.clear()
+        self.responses.clear()
+
+    def key(self, request: Request, owner_id: uuid.UUID) -> ResponseCacheKey:
+        # Taken before the response is read, so that one read before a write
+        # is stored under the version the write replaced
+        query = sorted(request.query_params.multi_items())
+        return owner_id, self.version(owner_id), request.url.path, repr(query)
+
+    def get(self, request: Request, key: ResponseCacheKey) -> Response | None:
+        cached = self.responses.get(key)
+        route = getattr(request.scope.get("route"), "path_format", "unmatched")
+        response_cache_requests_total.labels(
+            route, "miss" if cached is None else "hit"
+        ).inc()
+        if cached is None:
+            return None
+
+        etag = cached.headers.get("etag")
+        if etag is not None and is_not_modified(request, etag):
+            return not_modified(etag)
+
+        return Response(cached.body, headers=cached.headers)
+
+    def set(self, key: ResponseCacheKey, response: Response) -> None:
+        self.responses.set(
+            key, CachedResponse(bytes(response.body), dict(response.headers))
+        )
+
+
+response_cache = ResponseCache(
+    maxsize=config.response_cache_size, ttl=config.response_cache_ttl_seconds
+)
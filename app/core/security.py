@@ -1,9 +1,13 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 
 import jwt
 from pwdlib import PasswordHash
 
 from app.core.config import config
+from app.core.metrics import password_hash_queue_depth, password_hash_waiting
 
 password_hash = PasswordHash.recommended()
 
@@ -11,12 +15,50 @@ password_hash = PasswordHash.recommended()
 ALGORITHM = "HS256"
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_hash.verify(plain_password, hashed_password)
+class PasswordHashExecutor:
+    """Runs Argon2 work on a bounded thread pool, off the event loop."""
+
+    def __init__(self, *, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self.queue_depth = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+
+    @property
+    def waiting(self) -> int:
+        return max(self.queue_depth - self.max_workers, 0)
+
+    def set_queue_depth(self, queue_depth: int) -> None:
+        self.queue_depth = queue_depth
+        password_hash_queue_depth.set(queue_depth)
+        password_hash_waiting.set(self.waiting)
+
+    async def run[*Ts, T](self, fn: Callable[[*Ts], T], *args: *Ts) -> T:
+        self.set_queue_depth(self.queue_depth + 1)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.set_queue_depth(self.queue_depth - 1)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hash_executor = PasswordHashExecutor(
+    max_workers=config.password_hash_max_workers
+)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_executor.run(
+        password_hash.verify, plain_password, hashed_password
+    )
 
 
-def hash_password(password: str) -> str:
-    return password_hash.hash(password)
+async def hash_password(password: str) -> str:
+    return await password_hash_executor.run(password_hash.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -34,13 +76,12 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 
-def verify_token(token: str) -> str | None:
+def decode_token(token: str) -> dict | None:
     try:
         payload = jwt.decode(token, config.secret_key, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             return None
 
-        return username
+        return payload
     except jwt.PyJWTError:
         return None
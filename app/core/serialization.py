@@ -0,0 +1,46 @@
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+import orjson
+from fastapi import Response
+from sqlalchemy import Row
+from sqlmodel import SQLModel
+
+
+def public_columns(
+    public_model: type[SQLModel], table_model: type[SQLModel]
+) -> list[Any]:
+    """Columns of `table_model` for the fields of `public_model`, in field order."""
+    return [getattr(table_model, name) for name in public_model.model_fields]
+
+
+def json_default(value: object) -> str:
+    # asyncpg returns its own `uuid.UUID` subclass, which orjson does not know
+    if isinstance(value, uuid.UUID):
+        return str(value)
+
+    raise TypeError
+
+
+class RowsJSONResponse(Response):
+    """JSON response serialized straight from result rows with orjson.
+
+    No ORM objects are built and nothing is validated against the route's
+    `response_model`, which then only documents the schema. Select the rows with
+    `public_columns` so they hold exactly the public fields.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Sequence[Row[Any]]) -> bytes:
+        if not content:
+            return b"[]"
+
+        # `OPT_UTC_Z` formats datetimes the way pydantic does
+        keys = content[0]._fields
+        return orjson.dumps(
+            [dict(zip(keys, row, strict=True)) for row in content],
+            default=json_default,
+            option=orjson.OPT_UTC_Z,
+        )
@@ -0,0 +1,100 @@
+import asyncio
+import copy
+import functools
+from collections.abc import Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+
+from app.core.config import config
+from app.core.metrics import coalesced_requests_total
+from app.core.response_cache import response_cache
+
+# Endpoint parameters filled by dependencies, which differ between requests
+DEPENDENCY_PARAMETERS = frozenset({"request", "session", "current_user"})
+
+
+class SingleFlight[K: Hashable, V]:
+    """Runs one call per key at a time, and hands its outcome to the identical
+    calls made while it is in flight."""
+
+    def __init__(self) -> None:
+        self.flights: dict[K, asyncio.Future[V]] = {}
+
+    async def do(self, key: K, call: Callable[[], Awaitable[V]]) -> tuple[V, bool]:
+        """The result of `call`, and whether it came from another call's flight."""
+        while (flight := self.flights.get(key)) is not None:
+            try:
+                return await asyncio.shield(flight), True
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # Its caller went away before it finished, so take over
+
+        flight = asyncio.get_running_loop().create_future()
+        self.flights[key] = flight
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Marked as retrieved, so that one nobody waited for is not logged
+            flight.exception()
+            raise
+        finally:
+            del self.flights[key]
+
+        flight.set_result(result)
+        return result, False
+
+
+def copy_response[V](result: V) -> V:
+    # Middlewares add their headers to the response they send, so each request
+    # gets its own copy
+    if isinstance(result, Response):
+        result = copy.copy(result)
+        result.raw_headers = list(result.raw_headers)
+
+    return result
+
+
+def coalesce[**P, R](endpoint: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """Share the outcome of a read `endpoint` with the identical requests made
+    while it runs, instead of running its queries again for each.
+
+    Requests are identical when made by the same user, with the same parameters
+    and `If-None-Match`, and no write of the user in between.
+    """
+    flights: SingleFlight[Hashable, R] = SingleFlight()
+
+    @functools.wraps(endpoint)
+    async def coalesced(*args: P.args, **kwargs: P.kwargs) -> R:
+        if not config.coalesce_reads:
+            return await endpoint(*args, **kwargs)
+
+        owner_id = kwargs["current_user"].id  # ty:ignore[unresolved-attribute]
+        request = kwargs.get("request")
+        key = (
+            owner_id,
+            # A read after a write must not get the outcome of one before it
+            response_cache.version(owner_id),
+            request.headers.get("If-None-Match")
+            if isinstance(request, Request)
+            else None,
+            tuple(
+                sorted(
+                    (name, value)
+                    for name, value in kwargs.items()
+                    if name not in DEPENDENCY_PARAMETERS
+                )
+            ),
+        )
+        result, shared = await flights.do(key, lambda: endpoint(*args, **kwargs))
+        if not shared:
+            return result
+
+        coalesced_requests_total.labels(coalesced.__name__).inc()
+        return copy_response(result)
+
+    return coalesced
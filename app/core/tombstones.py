@@ -0,0 +1,34 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import ColumnElement, DateTime, Insert, literal
+from sqlmodel import col, delete, insert, select
+
+from app.models import Label, Project, Task, Tombstone
+
+
+def delete_with_tombstones(
+    model: type[Task | Project | Label], *whereclause: ColumnElement[bool]
+) -> Insert:
+    """DELETE the rows of `model` matching `whereclause`, and record a tombstone
+    for each of them for the change feed, in one statement.
+
+    Returns the ids of the deleted rows.
+    """
+    deleted = (
+        delete(model)
+        .where(*whereclause)
+        .returning(col(model.id), col(model.owner_id))
+        .cte("deleted")
+    )
+    rows = select(
+        deleted.c.id,
+        literal(model.__tablename__),
+        literal(datetime.now(UTC), DateTime(timezone=True)),
+        deleted.c.owner_id,
+    )
+
+    return (
+        insert(Tombstone)
+        .from_select(["id", "entity", "deleted_at", "owner_id"], rows)
+        .returning(col(Tombstone.id))
+    )
@@ -1,14 +1,23 @@
+import time
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import Connection, event
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from sqlmodel import select
+from sqlalchemy.orm import Mapper, Session
+from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import engine
-from app.core.security import verify_token
+from app.core.cache import TTLCache
+from app.core.config import config
+from app.core.db import engine, recent_writers, replica_engine
+from app.core.metrics import user_cache_requests_total
+from app.core.notifications import CHANGES_CHANNEL
+from app.core.query_budget import check_query_budget, count_queries
+from app.core.response_cache import response_cache
+from app.core.security import decode_token
 from app.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -21,30 +30,114 @@ async_session = async_sessionmaker(
 )
 
 
-async def get_session() -> AsyncGenerator[AsyncSession]:
+replica_session = (
+    async_sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession]:
     async with async_session() as session:
-        yield session
+        if config.db_query_budget_mode == "off":
+            yield session
+            return
+
+        # Runs after the response is sent, so streamed bodies are counted too
+        with count_queries() as queries:
+            yield session
+        check_query_budget(request, queries)
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
 
+# Per-worker cache of access tokens to detached `User` snapshots, so the hot
+# path can skip both the JWT decode and the user lookup
+user_cache: TTLCache[str, User] = TTLCache(
+    maxsize=config.user_cache_size, ttl=config.user_cache_ttl_seconds
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(
+    _mapper: Mapper[User], _connection: Connection, target: User
+) -> None:
+    user_cache.invalidate_where(lambda user: user.id == target.id)
+
+
 async def get_current_user(token: TokenDep, session: SessionDep) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    username = verify_token(token)
-    if username is None:
+    cached_user = user_cache.get(token)
+    user_cache_requests_total.labels("miss" if cached_user is None else "hit").inc()
+    if cached_user is not None:
+        session.info["user_id"] = cached_user.id
+        return cached_user
+
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
 
-    results = await session.exec(select(User).where(User.username == username))
+    results = await session.exec(select(User).where(User.username == payload["sub"]))
     user = results.first()
     if not user:
         raise credentials_exception
 
+    # Never cache a token past its own expiry
+    expires_in = payload.get("exp", float("inf")) - time.time()
+    user_cache.set(token, User.model_validate(user.model_dump()), ttl=expires_in)
+
+    session.info["user_id"] = user.id
     return user
 
 
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
+
+
+@event.listens_for(Session, "before_commit")
+def notify_changes(session: Session) -> None:
+    # Delivered on commit, to the change event streams of the user
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        session.connection().execute(
+            select(func.pg_notify(CHANGES_CHANNEL, str(user_id)))
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def mark_recent_writer(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        recent_writers.set(user_id, True)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_cached_responses(session: Session) -> None:
+    # The NOTIFY also does, but only once it makes it back to this worker
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        response_cache.bump(user_id)
+
+
+async def get_read_session(
+    current_user: CurrentUserDep, session: SessionDep
+) -> AsyncGenerator[AsyncSession]:
+    """Session on the replica for handlers that only read, when one is set.
+
+    Falls back to the primary `session` if the user wrote recently. Statements
+    on either are counted by the query budget of `session`.
+    """
+    if replica_session is None or recent_writers.get(current_user.id):
+        yield session
+        return
+
+    async with replica_session() as read_session:
+        yield read_session
+
+
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
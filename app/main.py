@@ -1,15 +1,42 @@
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from app.core.config import config
+from app.core.db import engine, replica_engine, warm_up_pool
+from app.core.metrics import MetricsMiddleware, mark_worker_dead, render_metrics
+from app.core.notifications import change_listener
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import password_hash_executor
 from app.deps import SessionDep
 from app.models import HealthCheck
 from app.routers import auth, labels, projects, tasks
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    warmup = min(config.db_pool_warmup, config.db_pool_size)
+    await warm_up_pool(engine, warmup)
+    if replica_engine is not None:
+        await warm_up_pool(replica_engine, warmup)
+    change_listener.start()
+    yield
+    await change_listener.stop()
+    password_hash_executor.shutdown()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    mark_worker_dead()
+
+
 app = FastAPI(
     title="Task Management API",
     description="REST API for managing tasks.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -20,8 +47,12 @@ if config.all_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", NEXT_CURSOR_HEADER],
     )
 
+# Added last, so it is outermost and also times CORS preflight requests
+app.add_middleware(MetricsMiddleware)  # ty:ignore[invalid-argument-type]
+
 
 app.include_router(auth.router)
 app.include_router(projects.router)
@@ -37,3 +68,8 @@ app.include_router(labels.router)
 )
 async def read_health(*, _session: SessionDep) -> HealthCheck:
     return HealthCheck(status="ok")
+
+
+@app.get("/metrics", tags=["status"], include_in_schema=False)
+async def read_metrics() -> Response:
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
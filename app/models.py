@@ -1,8 +1,13 @@
 import uuid
 from datetime import UTC, datetime
+from typing import Any, Self
 
-from pydantic import EmailStr, field_validator
-from sqlmodel import Column, DateTime, Field, Relationship, SQLModel
+from pydantic import EmailStr, field_validator, model_validator
+from sqlalchemy import Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import Column, DateTime, Field, Index, Relationship, SQLModel, text
+
+TASK_SEARCH_CONFIG = "english"
 
 
 class UserBase(SQLModel):
@@ -11,7 +16,7 @@ class UserBase(SQLModel):
 
 
 class User(UserBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     hashed_password: str
 
@@ -52,7 +57,12 @@ class ProjectBase(SQLModel):
 
 
 class Project(ProjectBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    __table_args__ = (
+        # Serves the change feed, and by its prefix every lookup by owner
+        Index("ix_project_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC),
@@ -69,7 +79,8 @@ class Project(ProjectBase, table=True):
     owner: User = Relationship(back_populates="projects")
     tasks: list[Task] = Relationship(
         back_populates="project",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        passive_deletes=True,
+        sa_relationship_kwargs={"lazy": "raise"},
     )
 
 
@@ -97,7 +108,7 @@ class TaskLabelLink(SQLModel, table=True):
         foreign_key="task.id", primary_key=True, ondelete="CASCADE"
     )
     label_id: uuid.UUID = Field(
-        foreign_key="label.id", primary_key=True, ondelete="CASCADE"
+        foreign_key="label.id", primary_key=True, ondelete="CASCADE", index=True
     )
 
 
@@ -107,14 +118,39 @@ class TaskBase(SQLModel):
     priority: int = Field(default=1, ge=1, le=5)
     completed: bool = Field(default=False)
     due_date: datetime | None = Field(
-        default=None, sa_column=Column(DateTime(timezone=True), index=True)
+        default=None, sa_column=Column(DateTime(timezone=True))
     )
 
-    project_id: uuid.UUID | None = Field(default=None, foreign_key="project.id")
+    project_id: uuid.UUID | None = Field(
+        default=None, foreign_key="project.id", ondelete="SET NULL"
+    )
 
 
 class Task(TaskBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    __table_args__ = (
+        Index("ix_task_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # Serves the change feed, and the count and max(updated_at) behind the
+        # list ETags
+        Index("ix_task_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+        # Also covers the /tasks/stats aggregate, as an index-only scan
+        Index(
+            "ix_task_owner_id_completed_due_date",
+            "owner_id",
+            "completed",
+            "due_date",
+            postgresql_include=["priority"],
+        ),
+        # Serves the upcomming/today/overdue views, which only list open tasks
+        Index(
+            "ix_task_open_owner_id_due_date_id",
+            "owner_id",
+            "due_date",
+            "id",
+            postgresql_where=text("NOT completed"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC),
@@ -130,20 +166,46 @@ class Task(TaskBase, table=True):
     owner_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
     owner: User = Relationship(back_populates="tasks")
     project: Project | None = Relationship(
-        back_populates="tasks", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="tasks", sa_relationship_kwargs={"lazy": "raise"}
     )
     labels: list[Label] = Relationship(
         back_populates="tasks",
         link_model=TaskLabelLink,
-        sa_relationship_kwargs={"lazy": "selectin"},
+        passive_deletes=True,
+        sa_relationship_kwargs={"lazy": "raise"},
     )
 
 
+# Generated by Postgres and only read by search queries, so it is left unmapped
+task_search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', title), 'A') || "
+        f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', "
+        "coalesce(description, '')), 'B')",
+        persisted=True,
+    ),
+)
+Task.metadata.tables["task"].append_column(task_search_vector)
+Index(
+    "ix_task_owner_id_search_vector",
+    Task.metadata.tables["task"].c.owner_id,
+    task_search_vector,
+    postgresql_using="gin",
+)
+
+
 class TaskCreate(TaskBase):
     @field_validator("due_date")
     @classmethod
     def check_due_date_is_future(cls, v: datetime | None) -> datetime | None:
-        if v is not None and v < datetime.now(UTC):
+        if v is None:
+            return v
+        # Due dates are stored with a time zone, so naive ones are taken as UTC
+        if v.tzinfo is None:
+            v = v.replace(tzinfo=UTC)
+        if v < datetime.now(UTC):
             raise ValueError("due_date must be in the future")
         return v
 
@@ -177,19 +239,97 @@ class TaskUpdate(SQLModel):
     project_id: uuid.UUID | None = None
 
 
+class TaskStats(SQLModel):
+    total: int = 0
+    open: int = 0
+    completed: int = 0
+    overdue: int = 0
+    due_today: int = 0
+    by_priority: dict[int, int] = {}
+
+
+class TaskFilter(SQLModel):
+    completed: bool | None = None
+    priority: int | None = Field(default=None, ge=1, le=5)
+    due_after: datetime | None = None
+    due_before: datetime | None = None
+
+
+class TaskBulkSelection(SQLModel):
+    ids: list[uuid.UUID] | None = None
+    filter: TaskFilter | None = None
+
+    @model_validator(mode="after")
+    def check_ids_or_filter(self) -> Self:
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("exactly one of ids or filter must be given")
+        # An empty filter would select every task of the user
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("filter must set at least one field")
+        return self
+
+
+class TaskBulkUpdate(TaskBulkSelection):
+    update: TaskUpdate
+
+
+class TaskBulkDeletePublic(SQLModel):
+    deleted: list[uuid.UUID] = []
+
+
+class TaskBulkCreatePublic(SQLModel):
+    created: list[TaskPublic] = []
+    errors: list[BulkItemError] = []
+
+
+# Not a `TaskCreate`, as migrated tasks are often overdue or done, with past dates
+class TaskImport(TaskBase):
+    label_ids: list[uuid.UUID] = []
+
+
+class TaskImportPublic(SQLModel):
+    imported: int = 0
+    failed: int = 0
+    errors: list[BulkItemError] = []
+
+
 class LabelBase(SQLModel):
     name: str = Field(unique=True, index=True)
 
 
 class Label(LabelBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    __table_args__ = (
+        Index(
+            "ix_label_owner_id_name_trgm",
+            "owner_id",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # Serves the change feed, and by its prefix every lookup by owner
+        Index("ix_label_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, onupdate=lambda: datetime.now(UTC)
+        ),
+    )
 
     owner_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
     owner: User = Relationship(back_populates="labels")
     tasks: list[Task] = Relationship(
         back_populates="labels",
         link_model=TaskLabelLink,
-        sa_relationship_kwargs={"lazy": "selectin"},
+        passive_deletes=True,
+        sa_relationship_kwargs={"lazy": "raise"},
     )
 
 
@@ -200,6 +340,9 @@ class LabelCreate(LabelBase):
 class LabelPublic(LabelBase):
     id: uuid.UUID
 
+    created_at: datetime
+    updated_at: datetime
+
 
 class LabelPublicWithTasks(LabelPublic):
     tasks: list[TaskPublic] = []
@@ -209,6 +352,55 @@ class LabelUpdate(SQLModel):
     name: str | None = None
 
 
+class Tombstone(SQLModel, table=True):
+    """Models a deleted task, project or label, for the change feed."""
+
+    __table_args__ = (
+        Index("ix_tombstone_owner_id_deleted_at_id", "owner_id", "deleted_at", "id"),
+    )
+
+    # The id of the deleted row, which is never reused
+    id: uuid.UUID = Field(primary_key=True)
+    entity: str
+
+    deleted_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+    owner_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
+
+
+class TombstonePublic(SQLModel):
+    id: uuid.UUID
+    entity: str
+    deleted_at: datetime
+
+
+class TaskChange(TaskPublic):
+    """Models a task in the change feed, with the ids of its labels."""
+
+    label_ids: list[uuid.UUID] = []
+
+
+class Changes(SQLModel):
+    """Models a page of the change feed, see `GET /tasks/changes`."""
+
+    tasks: list[TaskChange] = []
+    projects: list[ProjectPublic] = []
+    labels: list[LabelPublic] = []
+    deleted: list[TombstonePublic] = []
+    next_cursor: str
+    has_more: bool = False
+
+
+class BulkItemError(SQLModel):
+    """Models a failed item of a bulk request, by its index in the payload."""
+
+    index: int
+    detail: str | list[dict[str, Any]]
+
+
 class HealthCheck(SQLModel):
     """Models a status check for our /health endpoint."""
 
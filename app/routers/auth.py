@@ -4,6 +4,7 @@ from fastapi import APIRouter, Body, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import select
 
+from app.core.query_budget import query_budget
 from app.core.security import create_access_token, hash_password, verify_password
 from app.deps import CurrentUserDep, SessionDep
 from app.models import Token, User, UserCreate, UserPublic
@@ -14,6 +15,7 @@ router = APIRouter(tags=["auth"])
 @router.post(
     "/register", status_code=status.HTTP_201_CREATED, response_model=UserPublic
 )
+@query_budget(3)
 async def register_user(
     *,
     session: SessionDep,
@@ -27,7 +29,7 @@ async def register_user(
             detail="Username already registered",
         )
 
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password(user.password)
     user_dict = user.model_dump()
     new_user = User.model_validate(
         user_dict, update={"hashed_password": hashed_password}
@@ -41,6 +43,7 @@ async def register_user(
 
 
 @router.post("/token", status_code=status.HTTP_200_OK, response_model=Token)
+@query_budget(1)
 async def login_for_access_token(
     *,
     session: SessionDep,
@@ -50,7 +53,7 @@ async def login_for_access_token(
         select(User).where(User.username == form_data.username)
     )
     user = results.first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -63,5 +66,6 @@ async def login_for_access_token(
 
 
 @router.get("/users/me", response_model=UserPublic)
+@query_budget(1)
 async def read_users_me(*, current_user: CurrentUserDep) -> User:
     return current_user
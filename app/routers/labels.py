@@ -1,17 +1,32 @@
 import uuid
-from collections.abc import Sequence
 from typing import Annotated
 
-from fastapi import APIRouter, Body, HTTPException, Path, Query, status
-from sqlmodel import select
-
-from app.deps import CurrentUserDep, SessionDep
+from fastapi import (
+    APIRouter,
+    Body,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlmodel import col, insert, select, update
+
+from app.core.etag import is_not_modified, not_modified, query_etag
+from app.core.query_budget import query_budget
+from app.core.response_cache import response_cache
+from app.core.serialization import RowsJSONResponse, public_columns
+from app.core.single_flight import coalesce
+from app.core.tombstones import delete_with_tombstones
+from app.deps import CurrentUserDep, ReadSessionDep, SessionDep
 from app.models import Label, LabelCreate, LabelPublic, LabelUpdate
 
 router = APIRouter(prefix="/labels", tags=["labels"])
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=LabelPublic)
+@query_budget(3)
 async def create_label(
     *,
     session: SessionDep,
@@ -20,33 +35,53 @@ async def create_label(
 ) -> Label:
     db_label = Label.model_validate(label, update={"owner_id": current_user.id})
 
-    session.add(db_label)
+    results = await session.exec(
+        insert(Label).values(db_label.model_dump()).returning(Label)
+    )
+    created = results.scalars().one()
     await session.commit()
-    await session.refresh(db_label)
 
-    return db_label
+    return created
 
 
 @router.get("/", response_model=list[LabelPublic])
+@query_budget(3)
+@coalesce
 async def read_labels(
     *,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(gt=0)] = 100,
-    # TODO: add filter query `q`, to fetch labels where name contains `q`
-) -> Sequence[Label]:
-    results = await session.exec(
-        select(Label)
-        .where(Label.owner_id == current_user.id)
-        .offset(offset)
-        .limit(limit)
+    q: Annotated[str | None, Query(min_length=1)] = None,
+) -> Response:
+    cache_key = response_cache.key(request, current_user.id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+
+    query = select(*public_columns(LabelPublic, Label)).where(
+        Label.owner_id == current_user.id
     )
+    if q is not None:
+        # ILIKE on Postgres, served by the trigram index on name
+        query = query.where(col(Label.name).icontains(q, autoescape=True))
+
+    etag = await query_etag(session, query, request.url, current_user.id)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
-    return results.all()
+    results = await session.exec(query.offset(offset).limit(limit))
+
+    response = RowsJSONResponse(results.all(), headers={"ETag": etag})
+    response_cache.set(cache_key, response)
+
+    return response
 
 
 @router.patch("/{label_id}", response_model=LabelPublic)
+@query_budget(3)
 async def update_label(
     *,
     session: SessionDep,
@@ -54,40 +89,43 @@ async def update_label(
     label_id: Annotated[uuid.UUID, Path()],
     label: Annotated[LabelUpdate, Body()],
 ) -> Label:
+    label_data = label.model_dump(exclude_unset=True)
+
     results = await session.exec(
-        select(Label).where(Label.id == label_id, Label.owner_id == current_user.id)
+        update(Label)
+        .where(col(Label.id) == label_id, col(Label.owner_id) == current_user.id)
+        .values(label_data)
+        .returning(Label)
+        .execution_options(synchronize_session=False)
     )
-    db_label = results.first()
+    db_label = results.scalars().first()
     if not db_label:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Label not found"
         )
 
-    label_data = label.model_dump(exclude_unset=True)
-    db_label.sqlmodel_update(label_data)
-
-    session.add(db_label)
     await session.commit()
-    await session.refresh(db_label)
 
     return db_label
 
 
 @router.delete("/{label_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(3)
 async def delete_label(
     *,
     session: SessionDep,
     current_user: CurrentUserDep,
     label_id: Annotated[uuid.UUID, Path()],
 ) -> None:
+    # Its task links are dropped by ON DELETE CASCADE
     results = await session.exec(
-        select(Label).where(Label.id == label_id, Label.owner_id == current_user.id)
+        delete_with_tombstones(
+            Label, col(Label.id) == label_id, col(Label.owner_id) == current_user.id
+        )
     )
-    label = results.first()
-    if not label:
+    if not results.first():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Label not found"
         )
 
-    await session.delete(label)
     await session.commit()
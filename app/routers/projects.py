@@ -1,23 +1,41 @@
 import uuid
-from collections.abc import Sequence
+from datetime import UTC, datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Body, HTTPException, Path, Query, status
-from sqlmodel import select
-
-from app.deps import CurrentUserDep, SessionDep
+from fastapi import (
+    APIRouter,
+    Body,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.orm import selectinload
+from sqlmodel import col, insert, select, update
+
+from app.core.etag import is_not_modified, not_modified, query_etag
+from app.core.query_budget import query_budget
+from app.core.response_cache import response_cache
+from app.core.serialization import RowsJSONResponse, public_columns
+from app.core.single_flight import coalesce
+from app.core.tombstones import delete_with_tombstones
+from app.deps import CurrentUserDep, ReadSessionDep, SessionDep
 from app.models import (
     Project,
     ProjectCreate,
     ProjectPublic,
     ProjectPublicWithTasks,
     ProjectUpdate,
+    Task,
 )
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=ProjectPublic)
+@query_budget(3)
 async def create_project(
     *,
     session: SessionDep,
@@ -26,35 +44,52 @@ async def create_project(
 ) -> Project:
     db_project = Project.model_validate(project, update={"owner_id": current_user.id})
 
-    session.add(db_project)
+    results = await session.exec(
+        insert(Project).values(db_project.model_dump()).returning(Project)
+    )
+    created = results.scalars().one()
     await session.commit()
-    await session.refresh(db_project)
 
-    return db_project
+    return created
 
 
 @router.get("/", response_model=list[ProjectPublic])
+@query_budget(3)
+@coalesce
 async def read_projects(
     *,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(gt=0)] = 100,
-) -> Sequence[Project]:
-    results = await session.exec(
-        select(Project)
-        .where(Project.owner_id == current_user.id)
-        .offset(offset)
-        .limit(limit)
+) -> Response:
+    cache_key = response_cache.key(request, current_user.id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+
+    query = select(*public_columns(ProjectPublic, Project)).where(
+        Project.owner_id == current_user.id
     )
+    etag = await query_etag(session, query, request.url, current_user.id)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
-    return results.all()
+    results = await session.exec(query.offset(offset).limit(limit))
+
+    response = RowsJSONResponse(results.all(), headers={"ETag": etag})
+    response_cache.set(cache_key, response)
+
+    return response
 
 
 @router.get("/{project_id}", response_model=ProjectPublic)
+@query_budget(2)
+@coalesce
 async def read_project(
     *,
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
     project_id: Annotated[uuid.UUID, Path()],
 ) -> Project:
@@ -73,16 +108,18 @@ async def read_project(
 
 
 @router.get("/{project_id}/tasks", response_model=ProjectPublicWithTasks)
+@query_budget(3)
+@coalesce
 async def read_project_tasks(
     *,
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
     project_id: Annotated[uuid.UUID, Path()],
 ) -> Project:
     results = await session.exec(
-        select(Project).where(
-            Project.id == project_id, Project.owner_id == current_user.id
-        )
+        select(Project)
+        .where(Project.id == project_id, Project.owner_id == current_user.id)
+        .options(selectinload(Project.tasks))  # ty:ignore[invalid-argument-type]
     )
     project = results.first()
     if not project:
@@ -94,6 +131,7 @@ async def read_project_tasks(
 
 
 @router.patch("/{project_id}", response_model=ProjectPublic)
+@query_budget(3)
 async def update_project(
     *,
     session: SessionDep,
@@ -101,44 +139,54 @@ async def update_project(
     project_id: Annotated[uuid.UUID, Path()],
     project: Annotated[ProjectUpdate, Body()],
 ) -> Project:
+    project_data = project.model_dump(exclude_unset=True)
+
     results = await session.exec(
-        select(Project).where(
-            Project.id == project_id, Project.owner_id == current_user.id
-        )
+        update(Project)
+        .where(col(Project.id) == project_id, col(Project.owner_id) == current_user.id)
+        .values(project_data)
+        .returning(Project)
+        .execution_options(synchronize_session=False)
     )
-    db_project = results.first()
+    db_project = results.scalars().first()
     if not db_project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    project_data = project.model_dump(exclude_unset=True)
-    db_project.sqlmodel_update(project_data)
-
-    session.add(db_project)
     await session.commit()
-    await session.refresh(db_project)
 
     return db_project
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(3)
 async def delete_project(
     *,
     session: SessionDep,
     current_user: CurrentUserDep,
     project_id: Annotated[uuid.UUID, Path()],
 ) -> None:
-    results = await session.exec(
-        select(Project).where(
-            Project.id == project_id, Project.owner_id == current_user.id
+    # Its tasks are kept and unassigned here rather than by ON DELETE SET NULL,
+    # so that their `updated_at` moves for the ETags and the change feed
+    unassigned = (
+        update(Task)
+        .where(
+            col(Task.project_id) == project_id, col(Task.owner_id) == current_user.id
         )
+        .values(project_id=None, updated_at=datetime.now(UTC))
+        .cte("unassigned")
     )
-    project = results.first()
-    if not project:
+    results = await session.exec(
+        delete_with_tombstones(
+            Project,
+            col(Project.id) == project_id,
+            col(Project.owner_id) == current_user.id,
+        ).add_cte(unassigned)
+    )
+    if not results.first():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    await session.delete(project)
     await session.commit()
@@ -1,29 +1,388 @@
+import csv
+import io
+import logging
 import uuid
-from collections.abc import Sequence
-from datetime import UTC, datetime, time
-from typing import Annotated
-
-from fastapi import APIRouter, Body, HTTPException, Path, Query, status
-from sqlmodel import col, select
-
-from app.deps import CurrentUserDep, SessionDep
+from collections import defaultdict
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime, time, timedelta
+from typing import Annotated, Any, Literal, NoReturn
+
+from fastapi import (
+    APIRouter,
+    Body,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    DateTime,
+    Exists,
+    Row,
+    Select,
+    false,
+    inspect,
+    literal,
+    true,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql import websearch_to_tsquery
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import col, delete, func, insert, not_, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.config import config
+from app.core.db import engine
+from app.core.etag import (
+    is_not_modified,
+    not_modified,
+    query_etag,
+    with_body_etag,
+)
+from app.core.notifications import stream_change_events
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.core.query_budget import query_budget
+from app.core.records import iter_csv_rows, iter_lines
+from app.core.response_cache import response_cache
+from app.core.serialization import RowsJSONResponse, public_columns
+from app.core.single_flight import coalesce
+from app.core.tombstones import delete_with_tombstones
+from app.deps import CurrentUserDep, ReadSessionDep, SessionDep
 from app.models import (
+    TASK_SEARCH_CONFIG,
+    BulkItemError,
+    Changes,
     Label,
     Project,
     Task,
+    TaskBulkCreatePublic,
+    TaskBulkDeletePublic,
+    TaskBulkSelection,
+    TaskBulkUpdate,
+    TaskChange,
     TaskCreate,
+    TaskFilter,
+    TaskImport,
+    TaskImportPublic,
     TaskLabelLink,
     TaskPublic,
     TaskPublicWithLabels,
     TaskPublicWithProject,
     TaskPublicWithProjectLabels,
+    TaskStats,
     TaskUpdate,
+    Tombstone,
+    task_search_vector,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+type TaskSortKey = Literal["created_at", "due_date"]
+type TaskExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES: dict[TaskExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Imported rows are stamped when their batch is copied, so the stamps go last
+TASK_STAMP_COLUMNS = ["created_at", "updated_at"]
+TASK_DATA_COLUMNS = [
+    column.name
+    for column in inspect(Task).columns
+    if column.name not in TASK_STAMP_COLUMNS
+]
+TASK_COPY_COLUMNS = [*TASK_DATA_COLUMNS, *TASK_STAMP_COLUMNS]
+
+type ChangePosition = tuple[datetime, uuid.UUID]
+
+# The field of `Changes` each table feeds, and the column it is ordered by
+CHANGE_FEEDS: dict[str, tuple[type[Task | Project | Label | Tombstone], str]] = {
+    "tasks": (Task, "updated_at"),
+    "projects": (Project, "updated_at"),
+    "labels": (Label, "updated_at"),
+    "deleted": (Tombstone, "deleted_at"),
+}
+
+
+def paginate_tasks[Q: Select[Any]](
+    query: Q,
+    *,
+    sort_key: TaskSortKey,
+    cursor: str | None,
+    offset: int,
+    limit: int,
+) -> Q:
+    sort_column = col(getattr(Task, sort_key))
+    query = query.order_by(sort_column.asc(), col(Task.id).asc())
+    if cursor is None:
+        return query.offset(offset).limit(limit)
+
+    try:
+        sort_value, task_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from e
+
+    return query.where(tuple_(sort_column, col(Task.id)) > (sort_value, task_id)).limit(
+        limit
+    )
+
+
+def filter_tasks(task_filter: TaskFilter) -> list[ColumnElement[bool]]:
+    clauses: list[ColumnElement[bool]] = []
+    if task_filter.completed is not None:
+        clauses.append(col(Task.completed) == task_filter.completed)
+    if task_filter.priority is not None:
+        clauses.append(col(Task.priority) == task_filter.priority)
+    if task_filter.due_after is not None:
+        clauses.append(col(Task.due_date) >= task_filter.due_after)
+    if task_filter.due_before is not None:
+        clauses.append(col(Task.due_date) < task_filter.due_before)
+
+    return clauses
+
+
+def select_tasks_bulk(
+    selection: TaskBulkSelection, owner_id: uuid.UUID
+) -> list[ColumnElement[bool]]:
+    if selection.filter is not None:
+        # One more than allowed, so that `check_bulk_size` can tell a filter
+        # matching too many tasks without touching all of them
+        ids = (
+            select(Task.id)
+            .where(col(Task.owner_id) == owner_id, *filter_tasks(selection.filter))
+            .limit(config.tasks_bulk_max_items + 1)
+        )
+        return [col(Task.owner_id) == owner_id, col(Task.id).in_(ids)]
+
+    ids = selection.ids or []
+    if len(ids) > config.tasks_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {config.tasks_bulk_max_items} ids are allowed",
+        )
+
+    return [col(Task.owner_id) == owner_id, col(Task.id).in_(ids)]
+
+
+def check_bulk_size(rows: Sequence[Any]) -> None:
+    # Raised before the commit, so that nothing is changed
+    if len(rows) > config.tasks_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The filter matches more than {config.tasks_bulk_max_items} tasks",
+        )
+
+
+async def stream_tasks(
+    session: AsyncSession,
+    query: SelectOfScalar[Task],
+    export_format: TaskExportFormat,
+) -> AsyncIterator[str]:
+    # `yield_per` makes asyncpg fetch through a server-side cursor, so only one
+    # batch of rows is held in memory at a time
+    results = await session.stream_scalars(
+        query.execution_options(yield_per=config.tasks_export_batch_size)
+    )
+
+    if export_format == "ndjson":
+        async for tasks in results.partitions():
+            yield "".join(
+                TaskPublic.model_validate(task).model_dump_json() + "\n"
+                for task in tasks
+            )
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(TaskPublic.model_fields))
+    writer.writeheader()
+    async for tasks in results.partitions():
+        writer.writerows(
+            TaskPublic.model_validate(task).model_dump(mode="json") for task in tasks
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def parse_task_import(
+    record: str | dict[str, str],
+    *,
+    project_ids: set[uuid.UUID],
+    label_ids: set[uuid.UUID],
+) -> TaskImport:
+    if isinstance(record, str):
+        task = TaskImport.model_validate_json(record)
+    else:
+        # CSV has no nulls or lists: empty cells are unset, labels are `;`-separated
+        data: dict[str, Any] = {k: v for k, v in record.items() if v != ""}
+        if "label_ids" in data:
+            data["label_ids"] = data["label_ids"].split(";")
+        task = TaskImport.model_validate(data)
+
+    if task.project_id is not None and task.project_id not in project_ids:
+        raise ValueError("Project not found")
+    if not label_ids.issuperset(task.label_ids):
+        raise ValueError("Label not found")
+
+    return task
+
+
+async def copy_tasks(
+    tasks: list[tuple[Any, ...]], links: list[tuple[uuid.UUID, uuid.UUID]]
+) -> None:
+    """COPY a batch of imported tasks, stamped now, in a transaction of its own.
+
+    The change feed relies on rows committing within its lag of their
+    `updated_at`, which one transaction for a whole long import would not.
+    """
+    now = datetime.now(UTC)
+    async with engine.begin() as connection:
+        # COPY runs on the asyncpg connection itself, inside the transaction
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        assert driver_connection is not None
+        await driver_connection.copy_records_to_table(
+            "task",
+            records=[(*task, now, now) for task in tasks],
+            columns=TASK_COPY_COLUMNS,
+        )
+        if links:
+            await driver_connection.copy_records_to_table(
+                "tasklabellink", records=links, columns=["task_id", "label_id"]
+            )
+
+
+def select_owned_task_label(
+    task_id: uuid.UUID, label_id: uuid.UUID, owner_id: uuid.UUID
+) -> tuple[CTE, CTE]:
+    task = (
+        select(Task.id)
+        .where(Task.id == task_id, Task.owner_id == owner_id)
+        .cte("owned_task")
+    )
+    label = (
+        select(Label.id)
+        .where(Label.id == label_id, Label.owner_id == owner_id)
+        .cte("owned_label")
+    )
+
+    return task, label
+
+
+async def check_label_link_change(
+    session: AsyncSession,
+    task: CTE,
+    label: CTE,
+    change: CTE,
+    *,
+    not_modified_detail: str,
+) -> None:
+    """Run the `change` to a task's label link, and check that it took effect.
+
+    Selecting the row counts of the CTEs makes a single statement both apply the
+    change and tell a missing task or label apart from a no-op. A change also
+    bumps the task's `updated_at`, for the ETags and the change feed.
+    """
+    touched = (
+        update(Task)
+        .where(col(Task.id).in_(select(change.c.task_id)))
+        .values(updated_at=datetime.now(UTC))
+        .cte("touched")
+    )
+    results = await session.exec(
+        select(
+            select(func.count()).select_from(task).scalar_subquery(),
+            select(func.count()).select_from(label).scalar_subquery(),
+            select(func.count()).select_from(change).scalar_subquery(),
+        ).add_cte(touched)
+    )
+    task_count, label_count, change_count = results.one()
+    if not task_count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+    if not label_count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Label not found"
+        )
+    if not change_count:
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED, detail=not_modified_detail
+        )
+
+
+def owned_project_exists(project_id: uuid.UUID, owner_id: uuid.UUID) -> Exists:
+    return (
+        select(Project.id)
+        .where(Project.id == project_id, Project.owner_id == owner_id)
+        .exists()
+    )
+
+
+async def raise_task_or_project_not_found(
+    session: AsyncSession, task_id: uuid.UUID, owner_id: uuid.UUID
+) -> NoReturn:
+    """Raise the 404 for whichever of the task or its new project is missing.
+
+    Only called once an update guarded by `owned_project_exists` matched no row,
+    so the extra query is paid on that miss alone.
+    """
+    results = await session.exec(
+        select(Task.id).where(Task.id == task_id, Task.owner_id == owner_id)
+    )
+    if not results.first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+    )
+
+
+def set_next_cursor(
+    response: Response, tasks: Sequence[Row[Any]], *, sort_key: TaskSortKey, limit: int
+) -> None:
+    if len(tasks) < limit:
+        return
+
+    last_task = tasks[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        getattr(last_task, sort_key), last_task.id
+    )
+
+
+def select_changes(
+    model: type[Task | Project | Label | Tombstone],
+    changed_at: str,
+    *,
+    owner_id: uuid.UUID,
+    since: ChangePosition | None,
+    limit: int,
+) -> SelectOfScalar[Any]:
+    changed_at_column = col(getattr(model, changed_at))
+    query = select(model).where(col(model.owner_id) == owner_id)
+    if since is not None:
+        query = query.where(tuple_(changed_at_column, col(model.id)) > since)
+
+    return query.order_by(changed_at_column.asc(), col(model.id).asc()).limit(limit)
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=TaskPublic)
+@query_budget(3)
 async def create_task(
     *,
     session: SessionDep,
@@ -32,11 +391,218 @@ async def create_task(
 ) -> Task:
     db_task = Task.model_validate(task, update={"owner_id": current_user.id})
 
-    session.add(db_task)
+    results = await session.exec(
+        insert(Task).values(db_task.model_dump()).returning(Task)
+    )
+    created = results.scalars().one()
     await session.commit()
-    await session.refresh(db_task)
 
-    return db_task
+    return created
+
+
+@router.post("/bulk", response_model=TaskBulkCreatePublic)
+@query_budget(4)
+async def create_tasks_bulk(
+    *,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+    tasks: Annotated[
+        list[dict[str, Any]],
+        Body(min_length=1, max_length=config.tasks_bulk_max_items),
+    ],
+) -> TaskBulkCreatePublic:
+    errors: list[BulkItemError] = []
+    valid_tasks: list[tuple[int, TaskCreate]] = []
+    for index, item in enumerate(tasks):
+        try:
+            valid_tasks.append((index, TaskCreate.model_validate(item)))
+        except ValidationError as e:
+            detail = e.errors(include_url=False, include_context=False)
+            errors.append(BulkItemError(index=index, detail=detail))
+
+    project_ids = {task.project_id for _, task in valid_tasks if task.project_id}
+    owned_project_ids: set[uuid.UUID] = set()
+    if project_ids:
+        results = await session.exec(
+            select(Project.id).where(
+                col(Project.id).in_(project_ids),
+                Project.owner_id == current_user.id,
+            )
+        )
+        owned_project_ids = set(results.all())
+
+    task_rows: list[dict[str, Any]] = []
+    for index, task in valid_tasks:
+        if task.project_id is not None and task.project_id not in owned_project_ids:
+            errors.append(BulkItemError(index=index, detail="Project not found"))
+            continue
+
+        db_task = Task.model_validate(task, update={"owner_id": current_user.id})
+        task_rows.append(db_task.model_dump())
+
+    created: Sequence[Task] = []
+    if task_rows:
+        # Executed as batched multi-row INSERT ... RETURNING statements. NULLs are
+        # rendered, or rows would be split into batches by their non-null columns
+        results = await session.exec(
+            insert(Task)
+            .returning(Task, sort_by_parameter_order=True)
+            .execution_options(render_nulls=True),
+            params=task_rows,
+        )
+        created = results.scalars().all()
+        await session.commit()
+
+    errors.sort(key=lambda error: error.index)
+
+    return TaskBulkCreatePublic.model_validate({"created": created, "errors": errors})
+
+
+@router.post("/import", response_model=TaskImportPublic)
+@query_budget(4)
+async def import_tasks(
+    *,
+    request: Request,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+    import_format: Annotated[TaskExportFormat, Query(alias="format")] = "ndjson",
+) -> TaskImportPublic:
+    results = await session.exec(
+        select(Project.id).where(Project.owner_id == current_user.id)
+    )
+    project_ids = set(results.all())
+    results = await session.exec(
+        select(Label.id).where(Label.owner_id == current_user.id)
+    )
+    label_ids = set(results.all())
+
+    lines = iter_lines(request.stream())
+    records = lines if import_format == "ndjson" else iter_csv_rows(lines)
+
+    summary = TaskImportPublic()
+    tasks: list[tuple[Any, ...]] = []
+    links: list[tuple[uuid.UUID, uuid.UUID]] = []
+    index = -1
+    try:
+        async for record in records:
+            if isinstance(record, str) and not record.strip():
+                continue
+
+            index += 1
+            try:
+                task = parse_task_import(
+                    record, project_ids=project_ids, label_ids=label_ids
+                )
+            except ValidationError as e:
+                detail = e.errors(include_url=False, include_context=False)
+            except ValueError as e:
+                detail = str(e)
+            else:
+                # Rows are built directly, instantiating `Task` costs more than the COPY
+                task_data = task.model_dump(exclude={"label_ids"}) | {
+                    "id": uuid.uuid4(),
+                    "owner_id": current_user.id,
+                }
+                tasks.append(tuple(task_data[column] for column in TASK_DATA_COLUMNS))
+                links.extend(
+                    (task_data["id"], label_id) for label_id in set(task.label_ids)
+                )
+                if len(tasks) >= config.tasks_import_batch_size:
+                    await copy_tasks(tasks, links)
+                    summary.imported += len(tasks)
+                    tasks, links = [], []
+                    logger.info(
+                        "Importing tasks for user %s: %d imported, %d failed",
+                        current_user.id,
+                        summary.imported,
+                        summary.failed,
+                    )
+                continue
+
+            summary.failed += 1
+            if len(summary.errors) < config.tasks_import_max_errors:
+                summary.errors.append(BulkItemError(index=index, detail=detail))
+    except ValueError as e:
+        # The batches before the error are committed already
+        detail = str(e)
+        if summary.imported:
+            detail += f", after {summary.imported} tasks were imported"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=detail
+        ) from e
+
+    if tasks:
+        await copy_tasks(tasks, links)
+        summary.imported += len(tasks)
+    # Notifies the change event streams of the user, once for the whole import
+    await session.commit()
+
+    logger.info(
+        "Imported tasks for user %s: %d imported, %d failed",
+        current_user.id,
+        summary.imported,
+        summary.failed,
+    )
+
+    return summary
+
+
+@router.patch("/bulk", response_model=list[TaskPublic])
+@query_budget(4)
+async def update_tasks_bulk(
+    *,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+    tasks: Annotated[TaskBulkUpdate, Body()],
+) -> Sequence[Task]:
+    task_data = tasks.update.model_dump(exclude_unset=True)
+    if not task_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update"
+        )
+
+    project_id = task_data.get("project_id")
+    if project_id is not None:
+        results = await session.exec(
+            select(Project.id).where(
+                Project.id == project_id, Project.owner_id == current_user.id
+            )
+        )
+        if not results.first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+            )
+
+    results = await session.exec(
+        update(Task)
+        .where(*select_tasks_bulk(tasks, current_user.id))
+        .values(task_data)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    updated = results.scalars().all()
+    check_bulk_size(updated)
+    await session.commit()
+
+    return updated
+
+
+@router.delete("/bulk", response_model=TaskBulkDeletePublic)
+@query_budget(3)
+async def delete_tasks_bulk(
+    *,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+    tasks: Annotated[TaskBulkSelection, Body()],
+) -> TaskBulkDeletePublic:
+    results = await session.exec(
+        delete_with_tombstones(Task, *select_tasks_bulk(tasks, current_user.id))
+    )
+    deleted = results.scalars().all()
+    check_bulk_size(deleted)
+    await session.commit()
+
+    return TaskBulkDeletePublic(deleted=list(deleted))
 
 
 @router.post(
@@ -44,35 +610,42 @@ async def create_task(
     status_code=status.HTTP_201_CREATED,
     response_model=TaskPublic,
 )
+@query_budget(3)
 async def create_task_copy(
     *,
     session: SessionDep,
     current_user: CurrentUserDep,
     task_id: Annotated[uuid.UUID, Path()],
 ) -> Task:
+    # INSERT ... SELECT copies the task without loading it first
+    now = datetime.now(UTC)
+    copy_values: dict[str, Any] = {
+        "id": literal(uuid.uuid4()),
+        "title": col(Task.title) + " (Copy)",
+        "completed": false(),
+        "created_at": literal(now, DateTime(timezone=True)),
+        "updated_at": literal(now, DateTime(timezone=True)),
+    }
+    source = select(
+        *(copy_values.get(name, getattr(Task, name)) for name in TASK_COPY_COLUMNS)
+    ).where(Task.id == task_id, Task.owner_id == current_user.id)
+
     results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
+        insert(Task).from_select(TASK_COPY_COLUMNS, source).returning(Task)
     )
-    db_task = results.first()
-    if not db_task:
+    new_task = results.scalars().first()
+    if not new_task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
         )
 
-    task_data = db_task.model_dump(
-        exclude={"id", "completed", "created_at", "updated_at"}
-    )
-    copy_title = f"{task_data['title']} (Copy)"
-    new_task = Task.model_validate(task_data, update={"title": copy_title})
-
-    session.add(new_task)
     await session.commit()
-    await session.refresh(new_task)
 
     return new_task
 
 
 @router.post("/{task_id}/labels/{label_id}", response_model=TaskPublicWithLabels)
+@query_budget(4)
 async def assign_label_to_task(
     *,
     session: SessionDep,
@@ -80,150 +653,436 @@ async def assign_label_to_task(
     task_id: Annotated[uuid.UUID, Path()],
     label_id: Annotated[uuid.UUID, Path()],
 ) -> Task:
-    results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
-    )
-    task = results.first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+    task, label = select_owned_task_label(task_id, label_id, current_user.id)
+    inserted = (
+        pg_insert(TaskLabelLink)
+        .from_select(
+            ["task_id", "label_id"],
+            select(task.c.id, label.c.id).join_from(task, label, true()),
         )
+        .on_conflict_do_nothing()
+        .returning(col(TaskLabelLink.task_id))
+        .cte("inserted")
+    )
+    await check_label_link_change(
+        session,
+        task,
+        label,
+        inserted,
+        not_modified_detail="Label already assigned to task",
+    )
+    await session.commit()
 
     results = await session.exec(
-        select(Label).where(Label.id == label_id, Label.owner_id == current_user.id)
+        select(Task).where(Task.id == task_id).options(joinedload(Task.labels))  # ty:ignore[invalid-argument-type]
     )
-    label = results.first()
-    if not label:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Labels not found"
-        )
-
-    if label in task.labels:
-        raise HTTPException(
-            status_code=status.HTTP_304_NOT_MODIFIED,
-            detail="Label already assigned to task",
-        )
 
-    task_label_link = TaskLabelLink(task_id=task_id, label_id=label_id)
-
-    session.add(task_label_link)
-    await session.commit()
-    await session.refresh(task)
-
-    return task
+    return results.unique().one()
 
 
 @router.get("/", response_model=list[TaskPublic])
+@query_budget(3)
+@coalesce
 async def read_tasks(
     *,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
+    cursor: Annotated[str | None, Query()] = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(gt=0)] = 100,
     completed: Annotated[bool | None, Query()] = None,
     priority: Annotated[int | None, Query(ge=1, le=5)] = None,
-) -> Sequence[Task]:
-    query = select(Task).where(Task.owner_id == current_user.id)
-    if completed is not None:
-        query = query.where(Task.completed == completed)
-    if priority is not None:
-        query = query.where(Task.priority == priority)
+    due_after: Annotated[datetime | None, Query()] = None,
+    due_before: Annotated[datetime | None, Query()] = None,
+) -> Response:
+    cache_key = response_cache.key(request, current_user.id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+
+    task_filter = TaskFilter(
+        completed=completed,
+        priority=priority,
+        due_after=due_after,
+        due_before=due_before,
+    )
+    query = select(*public_columns(TaskPublic, Task)).where(
+        Task.owner_id == current_user.id, *filter_tasks(task_filter)
+    )
+    etag = await query_etag(session, query, request.url, current_user.id)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    results = await session.exec(
+        paginate_tasks(
+            query, sort_key="created_at", cursor=cursor, offset=offset, limit=limit
+        )
+    )
+    tasks = results.all()
+    response = RowsJSONResponse(tasks, headers={"ETag": etag})
+    set_next_cursor(response, tasks, sort_key="created_at", limit=limit)
 
-    results = await session.exec(query.offset(offset).limit(limit))
+    response_cache.set(cache_key, response)
 
-    return results.all()
+    return response
 
 
 @router.get("/upcomming", response_model=list[TaskPublic])
+@query_budget(2)
+@coalesce
 async def read_upcomming_tasks(
     *,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
+    cursor: Annotated[str | None, Query()] = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(gt=0)] = 100,
     priority: Annotated[int | None, Query(ge=1, le=5)] = None,
-) -> Sequence[Task]:
+) -> Response:
+    cache_key = response_cache.key(request, current_user.id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+
     now = datetime.now(UTC)
 
     query = (
-        select(Task)
+        select(*public_columns(TaskPublic, Task))
         .where(Task.owner_id == current_user.id)
         .where(col(Task.due_date) > now)
-        .where(col(Task.completed).is_(False))
+        .where(not_(col(Task.completed)))
     )
     if priority is not None:
         query = query.where(Task.priority == priority)
 
     results = await session.exec(
-        query.order_by(col(Task.due_date).asc().nulls_last())
-        .offset(offset)
-        .limit(limit)
+        paginate_tasks(
+            query, sort_key="due_date", cursor=cursor, offset=offset, limit=limit
+        )
     )
+    tasks = results.all()
+    response = RowsJSONResponse(tasks)
+    set_next_cursor(response, tasks, sort_key="due_date", limit=limit)
 
-    return results.all()
+    response_cache.set(cache_key, response)
+
+    return response
 
 
 @router.get("/today", response_model=list[TaskPublic])
+@query_budget(2)
+@coalesce
 async def read_due_today_tasks(
     *,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
+    cursor: Annotated[str | None, Query()] = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(gt=0)] = 100,
     priority: Annotated[int | None, Query(ge=1, le=5)] = None,
-) -> Sequence[Task]:
+) -> Response:
+    cache_key = response_cache.key(request, current_user.id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+
     now = datetime.now(UTC)
     today_end = datetime.combine(now.date(), time.max, tzinfo=UTC)
     today_start = datetime.combine(now.date(), time.min, tzinfo=UTC)
 
     query = (
-        select(Task)
+        select(*public_columns(TaskPublic, Task))
         .where(Task.owner_id == current_user.id)
         .where(col(Task.due_date).between(today_start, today_end))
-        .where(col(Task.completed).is_(False))
+        .where(not_(col(Task.completed)))
     )
     if priority is not None:
         query = query.where(Task.priority == priority)
 
-    results = await session.exec(query.offset(offset).limit(limit))
+    results = await session.exec(
+        paginate_tasks(
+            query, sort_key="due_date", cursor=cursor, offset=offset, limit=limit
+        )
+    )
+    tasks = results.all()
+    response = RowsJSONResponse(tasks)
+    set_next_cursor(response, tasks, sort_key="due_date", limit=limit)
+
+    response_cache.set(cache_key, response)
 
-    return results.all()
+    return response
 
 
 @router.get("/overdue", response_model=list[TaskPublic])
+@query_budget(2)
+@coalesce
 async def read_overdue_tasks(
     *,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
+    cursor: Annotated[str | None, Query()] = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(gt=0)] = 100,
     priority: Annotated[int | None, Query(ge=1, le=5)] = None,
-) -> Sequence[Task]:
+) -> Response:
+    cache_key = response_cache.key(request, current_user.id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+
     now = datetime.now(UTC)
 
     query = (
-        select(Task)
+        select(*public_columns(TaskPublic, Task))
         .where(Task.owner_id == current_user.id)
         .where(col(Task.due_date) < now)
-        .where(col(Task.completed).is_(False))
+        .where(not_(col(Task.completed)))
     )
     if priority is not None:
         query = query.where(Task.priority == priority)
 
-    results = await session.exec(query.offset(offset).limit(limit))
+    results = await session.exec(
+        paginate_tasks(
+            query, sort_key="due_date", cursor=cursor, offset=offset, limit=limit
+        )
+    )
+    tasks = results.all()
+    response = RowsJSONResponse(tasks)
+    set_next_cursor(response, tasks, sort_key="due_date", limit=limit)
+
+    response_cache.set(cache_key, response)
+
+    return response
+
+
+@router.get("/search", response_model=list[TaskPublic])
+@query_budget(2)
+@coalesce
+async def search_tasks(
+    *,
+    session: ReadSessionDep,
+    current_user: CurrentUserDep,
+    q: Annotated[str, Query(min_length=1)],
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(gt=0)] = 100,
+) -> Response:
+    tsquery = websearch_to_tsquery(TASK_SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(task_search_vector, tsquery)
+
+    results = await session.exec(
+        select(*public_columns(TaskPublic, Task))
+        .where(
+            Task.owner_id == current_user.id,
+            task_search_vector.bool_op("@@")(tsquery),
+        )
+        .order_by(rank.desc(), col(Task.id).asc())
+        .offset(offset)
+        .limit(limit)
+    )
+
+    return RowsJSONResponse(results.all())
+
+
+@router.get("/stats", response_model=TaskStats)
+@query_budget(2)
+@coalesce
+async def read_task_stats(
+    *,
+    session: ReadSessionDep,
+    current_user: CurrentUserDep,
+) -> TaskStats:
+    now = datetime.now(UTC)
+    today_end = datetime.combine(now.date(), time.max, tzinfo=UTC)
+    today_start = datetime.combine(now.date(), time.min, tzinfo=UTC)
+    is_open = ~col(Task.completed)
+
+    results = await session.exec(
+        select(  # ty:ignore[no-matching-overload]
+            Task.priority,
+            func.count(),
+            func.count().filter(col(Task.completed)),
+            func.count().filter(is_open, col(Task.due_date) < now),
+            func.count().filter(
+                is_open, col(Task.due_date).between(today_start, today_end)
+            ),
+        )
+        .where(Task.owner_id == current_user.id)
+        .group_by(Task.priority)
+    )
+
+    stats = TaskStats()
+    for priority, total, completed, overdue, due_today in results.all():
+        stats.total += total
+        stats.completed += completed
+        stats.overdue += overdue
+        stats.due_today += due_today
+        stats.by_priority[priority] = total
+    stats.open = stats.total - stats.completed
+
+    return stats
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}
+        }
+    },
+)
+@query_budget(2)
+async def export_tasks(
+    *,
+    session: ReadSessionDep,
+    current_user: CurrentUserDep,
+    export_format: Annotated[TaskExportFormat, Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    query = (
+        select(Task)
+        .where(Task.owner_id == current_user.id)
+        .order_by(col(Task.created_at).asc(), col(Task.id).asc())
+    )
+
+    return StreamingResponse(
+        stream_tasks(session, query, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{export_format}"'
+        },
+    )
 
-    return results.all()
+
+@router.get("/changes", response_model=Changes)
+@query_budget(6)
+@coalesce
+async def read_changes(
+    *,
+    session: ReadSessionDep,
+    current_user: CurrentUserDep,
+    since: Annotated[str | None, Query()] = None,
+    limit: Annotated[int, Query(gt=0)] = 100,
+) -> Changes:
+    """Tasks, projects and labels created, updated or deleted after `since`.
+
+    Sync from no cursor, then from the `next_cursor` of each page while
+    `has_more`, and keep the last one for the next sync. A change can be sent
+    more than once, so clients should apply them by id.
+    """
+    position: ChangePosition | None = None
+    if since is not None:
+        try:
+            position = decode_cursor(since)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from e
+
+    changes: dict[str, list[Any]] = {}
+    positions: dict[str, list[ChangePosition]] = {}
+    for name, (model, changed_at) in CHANGE_FEEDS.items():
+        results = await session.exec(
+            select_changes(
+                model,
+                changed_at,
+                owner_id=current_user.id,
+                since=position,
+                limit=limit,
+            )
+        )
+        changes[name] = list(results.all())
+        positions[name] = [(getattr(row, changed_at), row.id) for row in changes[name]]
+
+    # A feed that filled the page may have more rows before the last ones of the
+    # other feeds, so the page ends at the earliest last row of the full feeds
+    full_feed_ends = [feed[-1] for feed in positions.values() if len(feed) == limit]
+    if full_feed_ends:
+        next_position = min(full_feed_ends)
+        for name, rows in changes.items():
+            changes[name] = [
+                row
+                for row, row_position in zip(rows, positions[name], strict=True)
+                if row_position <= next_position
+            ]
+    else:
+        # Rows are stamped before their transaction commits, so a row stamped
+        # within the lag can still show up behind rows already sent. The cursor
+        # stays behind the lag, and the next sync reads those rows again.
+        lag_start = datetime.now(UTC) - timedelta(
+            seconds=config.tasks_changes_lag_seconds
+        )
+        horizon = (lag_start, uuid.UUID(int=0))
+        last_position = max(
+            (feed[-1] for feed in positions.values() if feed),
+            default=position or horizon,
+        )
+        next_position = min(last_position, horizon)
+
+    # Label links bump their task, which is sent with the ids of all its labels
+    label_ids: defaultdict[uuid.UUID, list[uuid.UUID]] = defaultdict(list)
+    if changes["tasks"]:
+        results = await session.exec(
+            select(TaskLabelLink).where(
+                col(TaskLabelLink.task_id).in_([task.id for task in changes["tasks"]])
+            )
+        )
+        for link in results:
+            label_ids[link.task_id].append(link.label_id)
+    changes["tasks"] = [
+        TaskChange.model_validate(task, update={"label_ids": label_ids[task.id]})
+        for task in changes["tasks"]
+    ]
+
+    next_changed_at, next_id = next_position
+    next_cursor = encode_cursor(next_changed_at, next_id)
+
+    return Changes.model_validate(
+        changes | {"next_cursor": next_cursor, "has_more": bool(full_feed_ends)}
+    )
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {"text/event-stream": {}}}},
+)
+@query_budget(1)
+async def stream_task_events(
+    *,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+) -> StreamingResponse:
+    """Server-sent `changes` events, whenever tasks, projects or labels of the
+    user change, and once subscribed. Read what changed from `/tasks/changes`.
+    """
+    # The stream outlives the dependencies, so give the connection back now
+    await session.close()
+
+    return StreamingResponse(
+        stream_change_events(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{task_id}", response_model=TaskPublicWithProjectLabels)
+@query_budget(3)
+@coalesce
 async def read_task(
     *,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
     task_id: Annotated[uuid.UUID, Path()],
-) -> Task:
+) -> Response:
     results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
+        select(Task)
+        .where(Task.id == task_id, Task.owner_id == current_user.id)
+        .options(joinedload(Task.project), selectinload(Task.labels))  # ty:ignore[invalid-argument-type]
     )
     task = results.first()
     if not task:
@@ -231,10 +1090,16 @@ async def read_task(
             status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
         )
 
-    return task
+    # Renaming its project or labels does not touch `updated_at`, so the tag
+    # hashes the whole body
+    body = TaskPublicWithProjectLabels.model_validate(task).model_dump_json()
+    response = Response(body, media_type="application/json")
+
+    return with_body_etag(request, response)
 
 
 @router.patch("/{task_id}/projects/{project_id}", response_model=TaskPublicWithProject)
+@query_budget(4)
 async def assign_task_to_project(
     *,
     session: SessionDep,
@@ -243,34 +1108,28 @@ async def assign_task_to_project(
     project_id: Annotated[uuid.UUID, Path()],
 ) -> Task:
     results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
-    )
-    task = results.first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
-        )
-
-    results = await session.exec(
-        select(Project).where(
-            Project.id == project_id, Project.owner_id == current_user.id
+        update(Task)
+        .where(
+            col(Task.id) == task_id,
+            col(Task.owner_id) == current_user.id,
+            owned_project_exists(project_id, current_user.id),
         )
+        .values(project_id=project_id)
+        .returning(Task)
+        .options(selectinload(Task.project))  # ty:ignore[invalid-argument-type]
+        .execution_options(synchronize_session=False)
     )
-    project = results.first()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
-        )
-
-    task.project_id = project.id
+    task = results.scalars().first()
+    if not task:
+        await raise_task_or_project_not_found(session, task_id, current_user.id)
 
     await session.commit()
-    await session.refresh(task)
 
     return task
 
 
 @router.patch("/{task_id}", response_model=TaskPublicWithProject)
+@query_budget(4)
 async def update_task(
     *,
     session: SessionDep,
@@ -278,28 +1137,37 @@ async def update_task(
     task_id: Annotated[uuid.UUID, Path()],
     task: Annotated[TaskUpdate, Body()],
 ) -> Task:
+    task_data = task.model_dump(exclude_unset=True)
+
+    owned: list[ColumnElement[bool]] = [
+        col(Task.id) == task_id,
+        col(Task.owner_id) == current_user.id,
+    ]
+    project_id = task_data.get("project_id")
+    if project_id is not None:
+        owned.append(owned_project_exists(project_id, current_user.id))
+
     results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
+        update(Task)
+        .where(*owned)
+        .values(task_data)
+        .returning(Task)
+        .options(selectinload(Task.project))  # ty:ignore[invalid-argument-type]
+        .execution_options(synchronize_session=False)
     )
-    db_task = results.first()
+    db_task = results.scalars().first()
     if not db_task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
-        )
+        await raise_task_or_project_not_found(session, task_id, current_user.id)
 
-    task_data = task.model_dump(exclude_unset=True)
-    db_task.sqlmodel_update(task_data)
-
-    session.add(db_task)
     await session.commit()
-    await session.refresh(db_task)
 
     return db_task
 
 
 @router.delete(
-    "/{task_id}/projects/{project_id}", status_code=status.HTTP_404_NOT_FOUND
+    "/{task_id}/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT
 )
+@query_budget(4)
 async def remove_task_from_project(
     *,
     session: SessionDep,
@@ -308,32 +1176,24 @@ async def remove_task_from_project(
     project_id: Annotated[uuid.UUID, Path()],
 ) -> None:
     results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
-    )
-    task = results.first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
-        )
-
-    results = await session.exec(
-        select(Project).where(
-            Project.id == project_id, Project.owner_id == current_user.id
+        update(Task)
+        .where(
+            col(Task.id) == task_id,
+            col(Task.owner_id) == current_user.id,
+            owned_project_exists(project_id, current_user.id),
         )
+        .values(project_id=None)
+        .returning(col(Task.id))
+        .execution_options(synchronize_session=False)
     )
-    project = results.first()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
-        )
-
-    task.project_id = None
+    if not results.first():
+        await raise_task_or_project_not_found(session, task_id, current_user.id)
 
     await session.commit()
-    await session.refresh(task)
 
 
 @router.delete("/{task_id}/labels/{label_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(3)
 async def remove_label_from_task(
     *,
     session: SessionDep,
@@ -341,56 +1201,43 @@ async def remove_label_from_task(
     task_id: Annotated[uuid.UUID, Path()],
     label_id: Annotated[uuid.UUID, Path()],
 ) -> None:
-    results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
-    )
-    task = results.first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+    task, label = select_owned_task_label(task_id, label_id, current_user.id)
+    deleted = (
+        delete(TaskLabelLink)
+        .where(
+            col(TaskLabelLink.task_id) == task.c.id,
+            col(TaskLabelLink.label_id) == label.c.id,
         )
-
-    results = await session.exec(
-        select(Label).where(Label.id == label_id, Label.owner_id == current_user.id)
+        .returning(col(TaskLabelLink.task_id))
+        .cte("deleted")
     )
-    label = results.first()
-    if not label:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Mission not found"
-        )
-
-    task_label_link = await session.get(
-        TaskLabelLink,
-        (
-            task_id,
-            label_id,
-        ),
+    await check_label_link_change(
+        session,
+        task,
+        label,
+        deleted,
+        not_modified_detail="Label wasn't assigned to task",
     )
-    if not task_label_link:
-        raise HTTPException(
-            status_code=status.HTTP_304_NOT_MODIFIED,
-            detail="Label wasn't assigned to task",
-        )
-
-    await session.delete(task_label_link)
     await session.commit()
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(3)
 async def delete_task(
     *,
     session: SessionDep,
     current_user: CurrentUserDep,
     task_id: Annotated[uuid.UUID, Path()],
 ) -> None:
+    # Its label links are dropped by ON DELETE CASCADE
     results = await session.exec(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
+        delete_with_tombstones(
+            Task, col(Task.id) == task_id, col(Task.owner_id) == current_user.id
+        )
     )
-    task = results.first()
-    if not task:
+    if not results.first():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
         )
 
-    await session.delete(task)
     await session.commit()
@@ -0,0 +1,80 @@
+"""Compare creating tasks one by one against `POST /tasks/bulk`.
+
+Run against a live server, e.g.:
+
+    uv run python -m benchmarks.bulk_create --base-url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient) -> None:
+    username = f"bench-{uuid.uuid4().hex[:12]}"
+    password = uuid.uuid4().hex
+    response = await client.post(
+        "/register",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": password,
+        },
+    )
+    response.raise_for_status()
+    response = await client.post(
+        "/token", data={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+def make_tasks(count: int, prefix: str) -> list[dict]:
+    return [
+        {"title": f"{prefix} task {i}", "priority": i % 5 + 1} for i in range(count)
+    ]
+
+
+async def bench_single(client: httpx.AsyncClient, count: int) -> float:
+    start = time.perf_counter()
+    for task in make_tasks(count, "single"):
+        response = await client.post("/tasks/", json=task)
+        response.raise_for_status()
+
+    return time.perf_counter() - start
+
+
+async def bench_bulk(client: httpx.AsyncClient, count: int, batch_size: int) -> float:
+    tasks = make_tasks(count, "bulk")
+    start = time.perf_counter()
+    for i in range(0, count, batch_size):
+        response = await client.post("/tasks/bulk", json=tasks[i : i + batch_size])
+        response.raise_for_status()
+
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        await login(client)
+        single = await bench_single(client, args.count)
+        bulk = await bench_bulk(client, args.count, args.batch_size)
+
+    print(f"single: {args.count / single:10.1f} tasks/s ({single:.2f}s)")
+    print(f"bulk:   {args.count / bulk:10.1f} tasks/s ({bulk:.2f}s)")
+    print(f"speedup: {single / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
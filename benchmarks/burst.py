@@ -0,0 +1,143 @@
+"""Send bursts of identical reads at once, like a user's open tabs or a team
+dashboard refreshing, and report the SQL statements they cost.
+
+Each round, every user makes a write, which invalidates their cached responses,
+then sends `--burst` identical requests at once to each route in turn.
+Statements are read from the server's `/metrics`, which must sum across workers,
+as when it is started by `entrypoint.sh`. Run it against a server with
+`COALESCE_READS=false` to compare:
+
+    uv run python -m benchmarks.burst --users 10 --rounds 20 --burst 16
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.load import User, log_in, percentile
+from benchmarks.seed import DEFAULT_PASSWORD, DEFAULT_PREFIX, username
+
+ROUTES = [
+    "/tasks/",
+    "/tasks/upcomming",
+    "/tasks/stats",
+    "/tasks/{task_id}",
+    "/projects/",
+    "/labels/",
+]
+
+
+async def read_metrics(client: httpx.AsyncClient) -> dict[str, dict[str, float]]:
+    """Requests to each route so far, and the statements they ran."""
+    response = await client.get("/metrics")
+    response.raise_for_status()
+
+    totals = {route: {"requests": 0.0, "statements": 0.0} for route in ROUTES}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            route = sample.labels.get("route")
+            if sample.labels.get("method") == "GET" and route in totals:
+                if sample.name == "http_request_db_statements_count":
+                    totals[route]["requests"] += sample.value
+                elif sample.name == "http_request_db_statements_sum":
+                    totals[route]["statements"] += sample.value
+
+    return totals
+
+
+async def burst(
+    client: httpx.AsyncClient, user: User, route: str, size: int
+) -> list[float]:
+    path = route.format(task_id=user.task_ids[0])
+
+    async def request() -> float:
+        start = time.perf_counter()
+        response = await client.get(path, headers=user.headers)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    return await asyncio.gather(*(request() for _ in range(size)))
+
+
+async def run_round(
+    client: httpx.AsyncClient, users: list[User], size: int
+) -> dict[str, list[float]]:
+    await asyncio.gather(
+        *(
+            client.patch(f"/tasks/{user.task_ids[0]}", json={}, headers=user.headers)
+            for user in users
+        )
+    )
+    latencies: dict[str, list[float]] = {route: [] for route in ROUTES}
+    # One route at a time, so that the requests of a burst arrive together
+    for route in ROUTES:
+        bursts = await asyncio.gather(
+            *(burst(client, user, route, size) for user in users)
+        )
+        for durations in bursts:
+            latencies[route].extend(durations)
+
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.users * args.burst)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60
+    ) as client:
+        users = await asyncio.gather(
+            *(
+                log_in(client, username(args.prefix, i), args.password)
+                for i in range(args.users)
+            )
+        )
+        # Also warms up the user cache and connection pools
+        await run_round(client, users, 1)
+
+        before = await read_metrics(client)
+        latencies: dict[str, list[float]] = {route: [] for route in ROUTES}
+        for _ in range(args.rounds):
+            for route, durations in (
+                await run_round(client, users, args.burst)
+            ).items():
+                latencies[route].extend(durations)
+        after = await read_metrics(client)
+
+    print(
+        f"{'route':20} {'reqs':>7} {'stmts':>7} {'stmts/req':>10} "
+        f"{'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for route in ROUTES:
+        requests = after[route]["requests"] - before[route]["requests"]
+        statements = after[route]["statements"] - before[route]["statements"]
+        durations = sorted(latencies[route])
+        print(
+            f"{route:20} {requests:7.0f} {statements:7.0f} "
+            f"{statements / requests if requests else 0:10.2f} "
+            f"{percentile(durations, 0.50) or 0:8.1f} "
+            f"{percentile(durations, 0.95) or 0:8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=10, help="seeded users to use")
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--burst", type=int, default=16, help="identical requests sent at once"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
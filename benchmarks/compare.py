@@ -0,0 +1,53 @@
+"""Compare two result files of `benchmarks.load`, endpoint by endpoint.
+
+Changes are relative to the first file, so with an older run first a negative
+latency change is an improvement:
+
+    uv run python -m benchmarks.compare benchmarks/results/old.json new.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+METRICS = ["throughput", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def change(old: float | None, new: float | None) -> str:
+    if old is None or new is None:
+        return f"{'-':>17}"
+    relative = f"{(new - old) / old:+.0%}" if old else ""
+    return f"{new:9.1f} {relative:>7}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args()
+
+    baseline: dict[str, Any] = json.loads(args.baseline.read_text())
+    candidate: dict[str, Any] = json.loads(args.candidate.read_text())
+    print(f"baseline:  {baseline['started_at']} ({baseline['revision']})")
+    print(f"candidate: {candidate['started_at']} ({candidate['revision']})")
+    print(f"{'endpoint':52} " + " ".join(f"{metric:>17}" for metric in METRICS))
+
+    names = [*baseline["endpoints"], "total"]
+    for name in names:
+        old = baseline["total"] if name == "total" else baseline["endpoints"][name]
+        new = (
+            candidate["total"] if name == "total" else candidate["endpoints"].get(name)
+        )
+        if not new or not old["requests"] or not new["requests"]:
+            continue
+        print(
+            f"{name:52} "
+            + " ".join(change(old[metric], new[metric]) for metric in METRICS)
+        )
+
+
+if __name__ == "__main__":
+    main()
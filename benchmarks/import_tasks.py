@@ -0,0 +1,85 @@
+"""Measure the throughput of `POST /tasks/import` for NDJSON and CSV uploads.
+
+Rows are generated while uploading, so neither side holds the whole file.
+Run against a live server, e.g.:
+
+    uv run python -m benchmarks.import_tasks --base-url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import time
+from collections.abc import AsyncIterator
+
+import httpx
+
+from benchmarks.bulk_create import login
+
+CHUNK_ROWS = 1000
+
+
+def make_row(i: int) -> dict:
+    return {
+        "title": f"imported task {i}",
+        "description": f"row {i} of the import benchmark",
+        "priority": i % 5 + 1,
+        "completed": i % 3 == 0,
+    }
+
+
+async def generate_ndjson(count: int) -> AsyncIterator[bytes]:
+    for start in range(0, count, CHUNK_ROWS):
+        rows = range(start, min(start + CHUNK_ROWS, count))
+        yield "".join(json.dumps(make_row(i)) + "\n" for i in rows).encode()
+
+
+async def generate_csv(count: int) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(make_row(0)))
+    writer.writeheader()
+    for start in range(0, count, CHUNK_ROWS):
+        writer.writerows(
+            make_row(i) for i in range(start, min(start + CHUNK_ROWS, count))
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def bench_import(client: httpx.AsyncClient, count: int, fmt: str) -> float:
+    content = generate_ndjson(count) if fmt == "ndjson" else generate_csv(count)
+    start = time.perf_counter()
+    response = await client.post(
+        "/tasks/import", params={"format": fmt}, content=content
+    )
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+
+    summary = response.json()
+    if summary["imported"] != count:
+        raise RuntimeError(f"Imported {summary['imported']} of {count} tasks")
+
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], nargs="+")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=600) as client:
+        await login(client)
+        for fmt in args.format or ["ndjson", "csv"]:
+            elapsed = await bench_import(client, args.count, fmt)
+            print(f"{fmt:6}: {args.count / elapsed:10.1f} tasks/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
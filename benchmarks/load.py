@@ -0,0 +1,550 @@
+"""Drive a realistic mix of requests at every endpoint and report latencies.
+
+Logs in as users created by `benchmarks.seed`, then `--concurrency` clients
+pick endpoints by weight until `--duration` is up. Reads dominate the mix, and
+deletes only hit rows the run created itself, so the dataset stays about the
+same across runs. Per endpoint p50/p95/p99 and throughput are printed and
+written as JSON, for `benchmarks.compare` to diff against other runs:
+
+    uv run python -m benchmarks.load --duration 60 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.seed import DEFAULT_PASSWORD, DEFAULT_PREFIX, WORDS, username
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+@dataclass
+class User:
+    headers: dict[str, str]
+    task_ids: list[str] = field(default_factory=list)
+    project_ids: list[str] = field(default_factory=list)
+    label_ids: list[str] = field(default_factory=list)
+    # Rows created by this run, which are the only ones it deletes
+    created_task_ids: list[str] = field(default_factory=list)
+    created_project_ids: list[str] = field(default_factory=list)
+    created_label_ids: list[str] = field(default_factory=list)
+    # Where this user's change feed sync got to
+    changes_cursor: str | None = None
+
+
+type Request = Callable[
+    [httpx.AsyncClient, User, random.Random], Awaitable[httpx.Response | None]
+]
+
+
+@dataclass
+class Operation:
+    name: str
+    weight: float
+    request: Request
+
+
+def created_id(response: httpx.Response, ids: list[str]) -> httpx.Response:
+    if response.is_success:
+        ids.append(response.json()["id"])
+    return response
+
+
+def due_date(rand: random.Random) -> str:
+    # New due dates must be in the future
+    return (datetime.now(UTC) + timedelta(days=rand.uniform(0.1, 30))).isoformat()
+
+
+def new_task(rand: random.Random) -> dict[str, Any]:
+    return {
+        "title": f"load {rand.choice(WORDS)} {rand.choice(WORDS)}",
+        "priority": rand.randint(1, 5),
+        "due_date": due_date(rand),
+    }
+
+
+async def read_tasks(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    params: dict[str, Any] = {"limit": rand.choice([20, 50, 100])}
+    if rand.random() < 0.3:
+        params["completed"] = rand.choice(["true", "false"])
+    if rand.random() < 0.2:
+        params["priority"] = rand.randint(1, 5)
+    response = await client.get("/tasks/", params=params, headers=user.headers)
+    cursor = response.headers.get("X-Next-Cursor")
+    if cursor and rand.random() < 0.3:
+        params["cursor"] = cursor
+        response = await client.get("/tasks/", params=params, headers=user.headers)
+    return response
+
+
+async def read_task(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    return await client.get(
+        f"/tasks/{rand.choice(user.task_ids)}", headers=user.headers
+    )
+
+
+async def search_tasks(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    params = {"q": " ".join(rand.sample(WORDS, rand.randint(1, 2)))}
+    return await client.get("/tasks/search", params=params, headers=user.headers)
+
+
+async def read_changes(
+    client: httpx.AsyncClient, user: User, _rand: random.Random
+) -> httpx.Response:
+    params = {"since": user.changes_cursor} if user.changes_cursor else {}
+    response = await client.get("/tasks/changes", params=params, headers=user.headers)
+    if response.is_success:
+        user.changes_cursor = response.json()["next_cursor"]
+    return response
+
+
+async def create_task(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    response = await client.post("/tasks/", json=new_task(rand), headers=user.headers)
+    return created_id(response, user.created_task_ids)
+
+
+async def create_tasks_bulk(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    tasks = [new_task(rand) for _ in range(rand.randint(10, 50))]
+    response = await client.post("/tasks/bulk", json=tasks, headers=user.headers)
+    if response.is_success:
+        user.created_task_ids.extend(t["id"] for t in response.json()["created"])
+    return response
+
+
+async def import_tasks(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    content = "".join(json.dumps(new_task(rand)) + "\n" for _ in range(100))
+    return await client.post("/tasks/import", content=content, headers=user.headers)
+
+
+async def update_tasks_bulk(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response | None:
+    if not user.created_task_ids:
+        return None
+    ids = rand.sample(user.created_task_ids, min(10, len(user.created_task_ids)))
+    body = {"ids": ids, "update": {"priority": rand.randint(1, 5)}}
+    return await client.patch("/tasks/bulk", json=body, headers=user.headers)
+
+
+async def delete_tasks_bulk(
+    client: httpx.AsyncClient, user: User, _rand: random.Random
+) -> httpx.Response | None:
+    if len(user.created_task_ids) < 20:
+        return None
+    ids, user.created_task_ids = user.created_task_ids[:10], user.created_task_ids[10:]
+    return await client.request(
+        "DELETE", "/tasks/bulk", json={"ids": ids}, headers=user.headers
+    )
+
+
+async def update_task(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    body = rand.choice(
+        [
+            {"completed": rand.random() < 0.5},
+            {"priority": rand.randint(1, 5)},
+            {"title": f"edited {rand.choice(WORDS)}"},
+            {"due_date": due_date(rand)},
+        ]
+    )
+    task_id = rand.choice(user.task_ids)
+    return await client.patch(f"/tasks/{task_id}", json=body, headers=user.headers)
+
+
+async def create_task_copy(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    task_id = rand.choice(user.task_ids)
+    response = await client.post(f"/tasks/{task_id}/duplicate", headers=user.headers)
+    return created_id(response, user.created_task_ids)
+
+
+async def delete_task(
+    client: httpx.AsyncClient, user: User, _rand: random.Random
+) -> httpx.Response | None:
+    if not user.created_task_ids:
+        return None
+    task_id = user.created_task_ids.pop()
+    return await client.delete(f"/tasks/{task_id}", headers=user.headers)
+
+
+async def assign_label(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response | None:
+    if not user.label_ids:
+        return None
+    path = f"/tasks/{rand.choice(user.task_ids)}/labels/{rand.choice(user.label_ids)}"
+    return await client.post(path, headers=user.headers)
+
+
+async def remove_label(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response | None:
+    if not user.label_ids:
+        return None
+    path = f"/tasks/{rand.choice(user.task_ids)}/labels/{rand.choice(user.label_ids)}"
+    return await client.delete(path, headers=user.headers)
+
+
+async def assign_project(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response | None:
+    if not user.project_ids:
+        return None
+    path = (
+        f"/tasks/{rand.choice(user.task_ids)}/projects/{rand.choice(user.project_ids)}"
+    )
+    return await client.patch(path, headers=user.headers)
+
+
+async def unassign_project(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response | None:
+    if not user.project_ids:
+        return None
+    path = (
+        f"/tasks/{rand.choice(user.task_ids)}/projects/{rand.choice(user.project_ids)}"
+    )
+    return await client.delete(path, headers=user.headers)
+
+
+async def create_project(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response:
+    body = {"title": f"load project {rand.choice(WORDS)}"}
+    response = await client.post("/projects/", json=body, headers=user.headers)
+    return created_id(response, user.created_project_ids)
+
+
+async def update_project(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response | None:
+    if not user.project_ids:
+        return None
+    body = {"title": f"project {rand.choice(WORDS)}"}
+    project_id = rand.choice(user.project_ids)
+    return await client.patch(
+        f"/projects/{project_id}", json=body, headers=user.headers
+    )
+
+
+async def delete_project(
+    client: httpx.AsyncClient, user: User, _rand: random.Random
+) -> httpx.Response | None:
+    if not user.created_project_ids:
+        return None
+    project_id = user.created_project_ids.pop()
+    return await client.delete(f"/projects/{project_id}", headers=user.headers)
+
+
+async def create_label(
+    client: httpx.AsyncClient, user: User, _rand: random.Random
+) -> httpx.Response:
+    body = {"name": f"load label {uuid.uuid4().hex}"}
+    response = await client.post("/labels/", json=body, headers=user.headers)
+    return created_id(response, user.created_label_ids)
+
+
+async def update_label(
+    client: httpx.AsyncClient, user: User, rand: random.Random
+) -> httpx.Response | None:
+    if not user.created_label_ids:
+        return None
+    body = {"name": f"load label {uuid.uuid4().hex}"}
+    label_id = rand.choice(user.created_label_ids)
+    return await client.patch(f"/labels/{label_id}", json=body, headers=user.headers)
+
+
+async def delete_label(
+    client: httpx.AsyncClient, user: User, _rand: random.Random
+) -> httpx.Response | None:
+    if not user.created_label_ids:
+        return None
+    label_id = user.created_label_ids.pop()
+    return await client.delete(f"/labels/{label_id}", headers=user.headers)
+
+
+async def register_user(
+    client: httpx.AsyncClient, _user: User, _rand: random.Random
+) -> httpx.Response:
+    name = f"load-{uuid.uuid4().hex[:12]}"
+    body = {"username": name, "email": f"{name}@example.com", "password": name}
+    return await client.post("/register", json=body)
+
+
+def get(path: str, **params: str | int) -> Request:
+    async def request(
+        client: httpx.AsyncClient, user: User, _rand: random.Random
+    ) -> httpx.Response:
+        return await client.get(path, params=params, headers=user.headers)
+
+    return request
+
+
+def get_project(path: str) -> Request:
+    async def request(
+        client: httpx.AsyncClient, user: User, rand: random.Random
+    ) -> httpx.Response | None:
+        if not user.project_ids:
+            return None
+        project_id = rand.choice(user.project_ids)
+        return await client.get(path.format(project_id), headers=user.headers)
+
+    return request
+
+
+OPERATIONS = [
+    Operation("GET /tasks/", 20, read_tasks),
+    Operation("GET /tasks/{task_id}", 15, read_task),
+    Operation("GET /tasks/upcomming", 5, get("/tasks/upcomming")),
+    Operation("GET /tasks/today", 5, get("/tasks/today")),
+    Operation("GET /tasks/overdue", 5, get("/tasks/overdue")),
+    Operation("GET /tasks/search", 4, search_tasks),
+    Operation("GET /tasks/stats", 4, get("/tasks/stats")),
+    Operation("GET /tasks/export", 0.2, get("/tasks/export")),
+    Operation("GET /tasks/changes", 5, read_changes),
+    Operation("GET /projects/", 5, get("/projects/")),
+    Operation("GET /projects/{project_id}", 3, get_project("/projects/{}")),
+    Operation("GET /projects/{project_id}/tasks", 2, get_project("/projects/{}/tasks")),
+    Operation("GET /labels/", 5, get("/labels/")),
+    Operation("GET /users/me", 3, get("/users/me")),
+    Operation("GET /health", 1, get("/health")),
+    Operation("POST /tasks/", 5, create_task),
+    Operation("POST /tasks/bulk", 0.5, create_tasks_bulk),
+    Operation("POST /tasks/import", 0.2, import_tasks),
+    Operation("PATCH /tasks/bulk", 0.5, update_tasks_bulk),
+    Operation("DELETE /tasks/bulk", 0.5, delete_tasks_bulk),
+    Operation("PATCH /tasks/{task_id}", 5, update_task),
+    Operation("POST /tasks/{task_id}/duplicate", 1, create_task_copy),
+    Operation("DELETE /tasks/{task_id}", 3, delete_task),
+    Operation("POST /tasks/{task_id}/labels/{label_id}", 2, assign_label),
+    Operation("DELETE /tasks/{task_id}/labels/{label_id}", 2, remove_label),
+    Operation("PATCH /tasks/{task_id}/projects/{project_id}", 1, assign_project),
+    Operation("DELETE /tasks/{task_id}/projects/{project_id}", 1, unassign_project),
+    Operation("POST /projects/", 1, create_project),
+    Operation("PATCH /projects/{project_id}", 1, update_project),
+    Operation("DELETE /projects/{project_id}", 1, delete_project),
+    Operation("POST /labels/", 1, create_label),
+    Operation("PATCH /labels/{label_id}", 1, update_label),
+    Operation("DELETE /labels/{label_id}", 1, delete_label),
+    Operation("POST /register", 0.1, register_user),
+]
+
+
+@dataclass
+class Samples:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    def add(self, seconds: float, status_code: int | None) -> None:
+        self.latencies.append(seconds)
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+        if status_code is not None:
+            self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+
+    def summary(self, duration: float) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "statuses": {str(code): n for code, n in sorted(self.statuses.items())},
+            "throughput": len(latencies) / duration,
+            "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else None,
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+        }
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    # Nearest rank, so the value is one that was actually measured
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[index] * 1000
+
+
+async def log_in(client: httpx.AsyncClient, name: str, password: str) -> User:
+    response = await client.post(
+        "/token", data={"username": name, "password": password}
+    )
+    response.raise_for_status()
+    user = User(headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    tasks, projects, labels = await asyncio.gather(
+        client.get("/tasks/", params={"limit": 500}, headers=user.headers),
+        client.get("/projects/", params={"limit": 500}, headers=user.headers),
+        client.get("/labels/", params={"limit": 500}, headers=user.headers),
+    )
+    user.task_ids = [task["id"] for task in tasks.json()]
+    user.project_ids = [project["id"] for project in projects.json()]
+    user.label_ids = [label["id"] for label in labels.json()]
+    if not user.task_ids:
+        raise RuntimeError(f"{name} has no tasks, run benchmarks.seed first")
+
+    return user
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    users: list[User],
+    samples: dict[str, Samples],
+    rand: random.Random,
+    *,
+    record_from: float,
+    deadline: float,
+) -> None:
+    weights = [operation.weight for operation in OPERATIONS]
+    while time.perf_counter() < deadline:
+        operation = rand.choices(OPERATIONS, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await operation.request(client, rand.choice(users), rand)
+        except httpx.HTTPError:
+            status_code = None
+        else:
+            if response is None:
+                continue
+            status_code = response.status_code
+        if start >= record_from:
+            samples[operation.name].add(time.perf_counter() - start, status_code)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except OSError, subprocess.CalledProcessError:
+        return None
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(
+        f"{'endpoint':52} {'reqs':>7} {'err':>5} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = [*report["endpoints"].items(), ("total", report["total"])]
+    for name, stats in rows:
+        if not stats["requests"]:
+            continue
+        print(
+            f"{name:52} {stats['requests']:7} {stats['errors']:5} "
+            f"{stats['throughput']:8.1f} {stats['p50_ms']:8.1f} "
+            f"{stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f}"
+        )
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    rand = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60
+    ) as client:
+        users = await asyncio.gather(
+            *(
+                log_in(client, username(args.prefix, i), args.password)
+                for i in range(args.users)
+            )
+        )
+
+        samples = {operation.name: Samples() for operation in OPERATIONS}
+        started_at = datetime.now(UTC)
+        record_from = time.perf_counter() + args.warmup
+        deadline = record_from + args.duration
+        await asyncio.gather(
+            *(
+                worker(
+                    client,
+                    users,
+                    samples,
+                    random.Random(rand.getrandbits(64)),
+                    record_from=record_from,
+                    deadline=deadline,
+                )
+                for _ in range(args.concurrency)
+            )
+        )
+
+    total = Samples()
+    for endpoint in samples.values():
+        total.latencies.extend(endpoint.latencies)
+        total.errors += endpoint.errors
+        for code, count in endpoint.statuses.items():
+            total.statuses[code] = total.statuses.get(code, 0) + count
+
+    return {
+        "started_at": started_at.isoformat(),
+        "revision": git_revision(),
+        "config": vars(args) | {"output": str(args.output)},
+        "endpoints": {
+            name: endpoint.summary(args.duration) for name, endpoint in samples.items()
+        },
+        "total": total.summary(args.duration),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=10, help="seeded users to use")
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="defaults to benchmarks/results/load-<timestamp>.json",
+    )
+    args = parser.parse_args()
+
+    if args.output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        timestamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+        args.output = RESULTS_DIR / f"load-{timestamp}.json"
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
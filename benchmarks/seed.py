@@ -0,0 +1,207 @@
+"""Bulk-load a synthetic dataset into the configured Postgres database with COPY.
+
+Every user gets the same number of projects, labels and tasks. Tasks are spread
+over projects, priorities and due dates from a month ago to a month ahead, and
+get up to `--labels-per-task` labels. Users are named `<prefix>-<n>` and share
+one password, which is what `benchmarks.load` logs in with:
+
+    uv run python -m benchmarks.seed --users 100 --tasks 1000 --reset
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import asyncpg
+from sqlalchemy import inspect
+from sqlmodel import SQLModel
+
+from app.core.config import config
+from app.core.security import password_hash
+from app.models import Label, Project, Task, TaskLabelLink, User
+
+DEFAULT_PREFIX = "seed"
+DEFAULT_PASSWORD = "benchmark"
+
+WORDS = (
+    "alpha bravo report invoice review deploy design meeting backlog release "
+    "budget client draft email fix launch plan research sprint update"
+).split()
+
+
+def columns(model: type[SQLModel]) -> list[str]:
+    return [column.name for column in inspect(model).columns]
+
+
+def as_records(model: type[SQLModel], rows: list[dict[str, Any]]) -> list[tuple]:
+    names = columns(model)
+    return [tuple(row[name] for name in names) for row in rows]
+
+
+TABLE_COLUMNS = {
+    "project": columns(Project),
+    "label": columns(Label),
+    "task": columns(Task),
+    "tasklabellink": columns(TaskLabelLink),
+}
+
+
+def username(prefix: str, index: int) -> str:
+    return f"{prefix}-{index}"
+
+
+class Dataset:
+    """Rows for each user, drawn from a generator seeded with `--seed`."""
+
+    def __init__(self, args: argparse.Namespace, hashed_password: str) -> None:
+        self.args = args
+        self.hashed_password = hashed_password
+        self.random = random.Random(args.seed)
+        self.now = datetime.now(UTC)
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def user(self, index: int) -> dict[str, Any]:
+        name = username(self.args.prefix, index)
+        return {
+            "id": self.new_id(),
+            "username": name,
+            "email": f"{name}@example.com",
+            "hashed_password": self.hashed_password,
+            "created_at": self.now,
+            "updated_at": self.now,
+        }
+
+    def owned(self, user: dict[str, Any]) -> Iterator[tuple[str, list[tuple]]]:
+        rand = self.random
+        owner_id = user["id"]
+        projects = [
+            {
+                "id": self.new_id(),
+                "title": f"project {i}",
+                "owner_id": owner_id,
+                "created_at": self.now,
+                "updated_at": self.now,
+            }
+            for i in range(self.args.projects)
+        ]
+        # Label names are unique across all users
+        labels: list[dict[str, Any]] = [
+            {
+                "id": self.new_id(),
+                "name": f"{user['username']} label {i}",
+                "owner_id": owner_id,
+                "created_at": self.now,
+                "updated_at": self.now,
+            }
+            for i in range(self.args.labels)
+        ]
+
+        tasks: list[dict[str, Any]] = []
+        links: list[tuple[uuid.UUID, uuid.UUID]] = []
+        for i in range(self.args.tasks):
+            created_at = self.now - timedelta(seconds=rand.uniform(0, 90 * 86400))
+            has_due_date = rand.random() < 0.8
+            task_id = self.new_id()
+            task = {
+                "id": task_id,
+                "title": f"task {i} {rand.choice(WORDS)} {rand.choice(WORDS)}",
+                "description": " ".join(rand.choices(WORDS, k=12))
+                if rand.random() < 0.5
+                else None,
+                "priority": rand.randint(1, 5),
+                "completed": rand.random() < 0.3,
+                "due_date": self.now + timedelta(days=rand.uniform(-30, 30))
+                if has_due_date
+                else None,
+                "project_id": rand.choice(projects)["id"]
+                if projects and rand.random() < 0.8
+                else None,
+                "owner_id": owner_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            tasks.append(task)
+            count = rand.randint(0, min(self.args.labels_per_task, len(labels)))
+            links.extend((task_id, label["id"]) for label in rand.sample(labels, count))
+
+        yield "project", as_records(Project, projects)
+        yield "label", as_records(Label, labels)
+        yield "task", as_records(Task, tasks)
+        yield "tasklabellink", links
+
+
+async def seed(args: argparse.Namespace) -> dict[str, int]:
+    connection = await asyncpg.connect(
+        host=config.pg_host,
+        user=config.pg_user,
+        password=config.pg_password,
+        database=config.pg_database,
+        ssl=config.db_ssl,
+    )
+    dataset = Dataset(args, password_hash.hash(args.password))
+    counts = dict.fromkeys(["user", *TABLE_COLUMNS], 0)
+    try:
+        async with connection.transaction():
+            if args.reset:
+                # Everything they own goes with them through ON DELETE CASCADE
+                await connection.execute(
+                    'DELETE FROM "user" WHERE username LIKE $1', f"{args.prefix}-%"
+                )
+
+            users = [dataset.user(i) for i in range(args.users)]
+            await connection.copy_records_to_table(
+                "user", records=as_records(User, users), columns=columns(User)
+            )
+            counts["user"] = len(users)
+
+            for user in users:
+                for table, records in dataset.owned(user):
+                    await connection.copy_records_to_table(
+                        table, records=records, columns=TABLE_COLUMNS[table]
+                    )
+                    counts[table] += len(records)
+
+        await connection.execute("ANALYZE")
+    finally:
+        await connection.close()
+
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=1000, help="per user")
+    parser.add_argument("--projects", type=int, default=10, help="per user")
+    parser.add_argument("--labels", type=int, default=10, help="per user")
+    parser.add_argument("--labels-per-task", type=int, default=3)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="delete the users of a previous run with the same prefix first",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = asyncio.run(seed(args))
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts.values())
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"{total} rows in {elapsed:.2f}s ({total / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
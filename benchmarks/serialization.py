@@ -0,0 +1,112 @@
+"""Compare the CPU cost of serializing a page of tasks, labels and projects.
+
+`orm` is what FastAPI did for the list endpoints: validate the ORM objects into
+the `response_model` and dump that to JSON. `rows` is `RowsJSONResponse`, which
+dumps the selected columns directly. Building the ORM objects is not counted,
+so the real savings per request are larger. No database or server is needed:
+
+    uv run python -m benchmarks.serialization --page-size 100
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from asyncpg.pgproto.pgproto import UUID as PgUUID
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+from sqlmodel import SQLModel
+
+from app.core.serialization import RowsJSONResponse
+from app.models import Label, LabelPublic, Project, ProjectPublic, Task, TaskPublic
+
+
+def make_tasks(count: int) -> list[Task]:
+    now = datetime.now(UTC)
+    return [
+        Task(
+            title=f"task {i}",
+            description=f"description of task {i}",
+            priority=i % 5 + 1,
+            completed=i % 3 == 0,
+            due_date=now + timedelta(days=i),
+            project_id=uuid.uuid4(),
+            owner_id=uuid.uuid4(),
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def make_projects(count: int) -> list[Project]:
+    return [Project(title=f"project {i}", owner_id=uuid.uuid4()) for i in range(count)]
+
+
+def make_labels(count: int) -> list[Label]:
+    return [Label(name=f"label {i}", owner_id=uuid.uuid4()) for i in range(count)]
+
+
+def as_fetched(value: object) -> object:
+    # asyncpg returns its own UUID class, which is slower to serialize
+    return PgUUID(str(value)) if isinstance(value, uuid.UUID) else value
+
+
+def to_rows(objects: list[Any], public_model: type[SQLModel]) -> list[Row[Any]]:
+    keys = list(public_model.model_fields)
+    data = [tuple(as_fetched(getattr(obj, key)) for key in keys) for obj in objects]
+    return list(IteratorResult(SimpleResultMetaData(keys), iter(data)).all())
+
+
+def bench(fn: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    cases: list[tuple[str, list[Any], type[SQLModel]]] = [
+        ("tasks", make_tasks(args.page_size), TaskPublic),
+        ("projects", make_projects(args.page_size), ProjectPublic),
+        ("labels", make_labels(args.page_size), LabelPublic),
+    ]
+    for name, objects, public_model in cases:
+        adapter = TypeAdapter(list[public_model])  # ty:ignore[invalid-type-form]
+        rows = to_rows(objects, public_model)
+
+        def orm(
+            objects: list[Any] = objects, adapter: TypeAdapter = adapter
+        ) -> bytes | memoryview:
+            content = adapter.dump_python(
+                adapter.validate_python(objects, from_attributes=True), mode="json"
+            )
+            return JSONResponse(content).body
+
+        def direct(rows: list[Row[Any]] = rows) -> bytes | memoryview:
+            return RowsJSONResponse(rows).body
+
+        if json.loads(bytes(orm())) != json.loads(bytes(direct())):
+            raise RuntimeError(f"{name}: serialized pages differ")
+
+        orm_time = bench(orm, args.number)
+        rows_time = bench(direct, args.number)
+        print(
+            f"{name:8} orm: {orm_time * 1e6:8.1f} us/page  "
+            f"rows: {rows_time * 1e6:8.1f} us/page  "
+            f"speedup: {orm_time / rows_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
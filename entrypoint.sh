@@ -2,4 +2,9 @@
 
 uv run alembic upgrade head
 
+# Workers write their metrics here, and /metrics sums them across workers
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+rm -f "$PROMETHEUS_MULTIPROC_DIR"/*.db
+
 uv run uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4
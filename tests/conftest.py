@@ -0,0 +1,160 @@
+"""Fixtures for tests against the database configured by `PG_*`, migrated to
+head. Each test gets its own user, deleted with all its data afterwards.
+
+Every request runs with `DB_QUERY_BUDGET_MODE=raise`, so one that goes over the
+budget of its route, or repeats a statement, fails the test that made it.
+"""
+
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import AbstractContextManager, asynccontextmanager, contextmanager
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import col, delete
+
+from app.core.config import config
+from app.core.db import engine
+from app.core.query_budget import QueryCounter, count_queries
+from app.main import app
+from app.models import User
+
+PASSWORD = "password"
+
+type AssertNumQueries = Callable[[int], AbstractContextManager[QueryCounter]]
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def query_budget_mode(monkeypatch: pytest.MonkeyPatch) -> str:
+    monkeypatch.setattr(config, "db_query_budget_mode", "raise")
+    return config.db_query_budget_mode
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[AsyncClient]:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+    # Pooled connections are bound to the event loop of the test
+    await engine.dispose()
+
+
+@asynccontextmanager
+async def registered_user(client: AsyncClient) -> AsyncIterator[dict[str, str]]:
+    username = f"test-{uuid.uuid4().hex}"
+    response = await client.post(
+        "/register",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+        },
+    )
+    response.raise_for_status()
+    yield response.json()
+
+    async with engine.begin() as connection:
+        await connection.execute(
+            delete(User).where(col(User.id) == uuid.UUID(response.json()["id"]))
+        )
+
+
+async def log_in(client: AsyncClient, user: dict[str, str]) -> dict[str, str]:
+    response = await client.post(
+        "/token", data={"username": user["username"], "password": PASSWORD}
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Caches the user, so that counts leave out the lookup of a cache miss
+    response = await client.get("/users/me", headers=headers)
+    response.raise_for_status()
+
+    return headers
+
+
+@pytest.fixture
+async def user(client: AsyncClient) -> AsyncIterator[dict[str, str]]:
+    async with registered_user(client) as user:
+        yield user
+
+
+@pytest.fixture
+async def headers(client: AsyncClient, user: dict[str, str]) -> dict[str, str]:
+    return await log_in(client, user)
+
+
+@pytest.fixture
+async def other_headers(client: AsyncClient) -> AsyncIterator[dict[str, str]]:
+    """Headers of a second user, to check that users never see each other's data."""
+    async with registered_user(client) as user:
+        yield await log_in(client, user)
+
+
+@pytest.fixture
+async def project(client: AsyncClient, headers: dict[str, str]) -> dict[str, Any]:
+    response = await client.post(
+        "/projects/", json={"title": "Project"}, headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@pytest.fixture
+async def label(client: AsyncClient, headers: dict[str, str]) -> dict[str, Any]:
+    # Label names are unique across users
+    response = await client.post(
+        "/labels/", json={"name": f"label-{uuid.uuid4().hex}"}, headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@pytest.fixture
+async def task(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    label: dict[str, Any],
+) -> dict[str, Any]:
+    """A task in `project`, labelled with `label`."""
+    response = await client.post(
+        "/tasks/", json={"title": "Task", "project_id": project["id"]}, headers=headers
+    )
+    response.raise_for_status()
+    task = response.json()
+
+    response = await client.post(
+        f"/tasks/{task['id']}/labels/{label['id']}", headers=headers
+    )
+    response.raise_for_status()
+    return task
+
+
+@pytest.fixture
+def assert_num_queries() -> AssertNumQueries:
+    """Asserts how many statements the block runs, including by the requests
+    made in it:
+
+        with assert_num_queries(1):
+            await client.get("/tasks/", headers=headers)
+    """
+
+    @contextmanager
+    def assert_num_queries(expected: int) -> Iterator[QueryCounter]:
+        with count_queries() as queries:
+            yield queries
+
+        assert queries.count == expected, (
+            f"ran {queries.count} statements instead of {expected}:\n"
+            + "\n".join(queries.statements)
+        )
+
+    return assert_num_queries
@@ -0,0 +1,26 @@
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+from tests.conftest import AssertNumQueries
+
+pytestmark = pytest.mark.anyio
+
+
+def user_cache_requests(result: str) -> float:
+    return (
+        REGISTRY.get_sample_value("user_cache_requests_total", {"result": result}) or 0
+    )
+
+
+async def test_read_users_me_from_cache(
+    client: AsyncClient, headers: dict[str, str], assert_num_queries: AssertNumQueries
+) -> None:
+    hits, misses = user_cache_requests("hit"), user_cache_requests("miss")
+
+    with assert_num_queries(0):
+        response = await client.get("/users/me", headers=headers)
+
+    assert response.status_code == 200
+    assert user_cache_requests("hit") == hits + 1
+    assert user_cache_requests("miss") == misses
@@ -0,0 +1,19 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.db import engine
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_failed_statement_leaves_no_timing_behind() -> None:
+    async with engine.connect() as connection:
+        with pytest.raises(DBAPIError):
+            await connection.execute(text("SELECT 1 / 0"))
+        await connection.rollback()
+        await connection.execute(text("SELECT 1"))
+
+        assert "query_start" not in connection.info
+
+    await engine.dispose()
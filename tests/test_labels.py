@@ -0,0 +1,54 @@
+import uuid
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import AssertNumQueries
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.usefixtures("task")
+async def test_read_labels(
+    client: AsyncClient,
+    headers: dict[str, str],
+    label: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # The ETag's count and last update, and the page, without the tasks
+    with assert_num_queries(2):
+        response = await client.get("/labels/", headers=headers)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [label["id"]]
+
+
+async def test_create_label(
+    client: AsyncClient, headers: dict[str, str], assert_num_queries: AssertNumQueries
+) -> None:
+    # INSERT ... RETURNING, and the NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.post(
+            "/labels/", json={"name": f"label-{uuid.uuid4().hex}"}, headers=headers
+        )
+
+    assert response.status_code == 201
+
+
+async def test_update_label(
+    client: AsyncClient,
+    headers: dict[str, str],
+    label: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    name = f"label-{uuid.uuid4().hex}"
+
+    # UPDATE ... RETURNING, and the NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.patch(
+            f"/labels/{label['id']}", json={"name": name}, headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == name
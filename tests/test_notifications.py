@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+from collections.abc import Callable
+
+import asyncpg
+import pytest
+
+from app.core.config import config
+from app.core.db import recent_writers
+from app.core.notifications import CHANGES_CHANNEL, ChangeListener, change_listener
+from app.core.response_cache import response_cache
+
+
+class FailingConnection:
+    """Connection dropped before the listener could be added."""
+
+    def __init__(self) -> None:
+        self.terminated = False
+
+    def add_termination_listener(self, _callback: Callable[..., None]) -> None:
+        pass
+
+    async def add_listener(self, _channel: str, _callback: Callable[..., None]) -> None:
+        raise asyncpg.InterfaceError("connection is closed")
+
+    def terminate(self) -> None:
+        self.terminated = True
+
+
+def test_notification_of_another_worker() -> None:
+    owner_id = uuid.uuid4()
+    version = response_cache.version(owner_id)
+
+    change_listener.on_notification(None, 0, CHANGES_CHANNEL, str(owner_id))  # ty:ignore[invalid-argument-type]
+
+    # Keeps the reads of the writer on the primary, past their cached responses
+    assert recent_writers.get(owner_id)
+    assert response_cache.version(owner_id) != version
+
+
+@pytest.mark.anyio
+async def test_listener_reconnects_after_a_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(config, "db_listen_reconnect_seconds", 0)
+    connections: list[FailingConnection] = []
+    reconnected = asyncio.Event()
+
+    async def connect(**_kwargs: object) -> FailingConnection:
+        if connections:
+            reconnected.set()
+        connections.append(FailingConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    listener = ChangeListener()
+    listener.start()
+    try:
+        await asyncio.wait_for(reconnected.wait(), timeout=1)
+    finally:
+        await listener.stop()
+
+    assert connections[0].terminated
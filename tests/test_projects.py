@@ -0,0 +1,113 @@
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import config
+from tests.conftest import AssertNumQueries
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.usefixtures("task")
+async def test_read_projects(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # The ETag's count and last update, and the page, without the tasks
+    with assert_num_queries(2):
+        response = await client.get("/projects/", headers=headers)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [project["id"]]
+
+
+@pytest.mark.usefixtures("task")
+async def test_read_project(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    with assert_num_queries(1):
+        response = await client.get(f"/projects/{project['id']}", headers=headers)
+
+    assert response.status_code == 200
+
+
+async def test_read_project_tasks(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # The project, and a selectin load of its tasks
+    with assert_num_queries(2):
+        response = await client.get(f"/projects/{project['id']}/tasks", headers=headers)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["tasks"]] == [task["id"]]
+
+
+async def test_create_project(
+    client: AsyncClient, headers: dict[str, str], assert_num_queries: AssertNumQueries
+) -> None:
+    # INSERT ... RETURNING, and the NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.post(
+            "/projects/", json={"title": "Project"}, headers=headers
+        )
+
+    assert response.status_code == 201
+
+
+async def test_update_project(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # UPDATE ... RETURNING, and the NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.patch(
+            f"/projects/{project['id']}", json={"title": "Renamed"}, headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+
+
+async def test_delete_project_unassigns_its_tasks(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(config, "tasks_changes_lag_seconds", 0)
+    response = await client.get("/tasks/", headers=headers)
+    etag = response.headers["ETag"]
+    response = await client.get("/tasks/changes", headers=headers)
+    since = response.json()["next_cursor"]
+
+    # The delete with its tombstone and the unassigning of its tasks, and the
+    # NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.delete(f"/projects/{project['id']}", headers=headers)
+    assert response.status_code == 204
+
+    response = await client.get("/tasks/", headers=headers | {"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["project_id"] is None
+    assert response.json()[0]["updated_at"] > task["updated_at"]
+
+    response = await client.get(
+        "/tasks/changes", params={"since": since}, headers=headers
+    )
+    assert [item["id"] for item in response.json()["tasks"]] == [task["id"]]
+    assert response.json()["tasks"][0]["project_id"] is None
+    assert [item["id"] for item in response.json()["deleted"]] == [project["id"]]
@@ -0,0 +1,66 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.query_budget import (
+    QUERY_BUDGET_ATTRIBUTE,
+    QueryBudgetExceeded,
+    QueryCounter,
+    count_queries,
+    statement_shape,
+)
+from app.routers import tasks
+from tests.conftest import AssertNumQueries
+
+pytestmark = pytest.mark.anyio
+
+
+def test_statement_shape_collapses_parameters() -> None:
+    assert (
+        statement_shape(
+            "SELECT task.id\nFROM task WHERE task.id IN ($1::UUID, $2::UUID, $3)"
+        )
+        == "SELECT task.id FROM task WHERE task.id IN (?)"
+    )
+    assert (
+        statement_shape("INSERT INTO label (id, name) VALUES ($1, $2), ($3, $4)")
+        == "INSERT INTO label (id, name) VALUES (?)"
+    )
+
+
+def test_repeated_shapes() -> None:
+    counter = QueryCounter(
+        ["SELECT 1 WHERE id = $1", "SELECT 1 WHERE id = $2", "SELECT 2"]
+    )
+
+    assert counter.repeated_shapes() == {"SELECT 1 WHERE id = ?": 2}
+
+
+def test_count_queries_nests() -> None:
+    with count_queries() as outer:
+        with count_queries() as inner:
+            assert outer.count == inner.count == 0
+
+
+async def test_route_within_budget(
+    client: AsyncClient,
+    headers: dict[str, str],
+    assert_num_queries: AssertNumQueries,
+    query_budget_mode: str,
+) -> None:
+    assert query_budget_mode == "raise"
+
+    with assert_num_queries(1):
+        response = await client.get("/tasks/stats", headers=headers)
+    assert response.status_code == 200
+
+
+async def test_route_over_budget_raises(
+    client: AsyncClient, headers: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(tasks.read_task_stats, QUERY_BUDGET_ATTRIBUTE, 0)
+
+    with pytest.raises(
+        QueryBudgetExceeded,
+        match=r"GET /tasks/stats ran 1 statements, with a budget of 0",
+    ):
+        await client.get("/tasks/stats", headers=headers)
@@ -0,0 +1,103 @@
+import socket
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import deps
+from app.core.config import config
+from app.core.db import create_replica_engine, recent_writers
+from tests.conftest import AssertNumQueries
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def replica_statements(
+    monkeypatch: pytest.MonkeyPatch,
+) -> AsyncIterator[list[str]]:
+    """Routes reads to the replica set by `PG_REPLICA_*`, and records the
+    statements run there.
+
+    Without one, the primary reached through another DSN stands in for it.
+    """
+    if config.pg_replica_host is None:
+        monkeypatch.setattr(
+            config, "pg_replica_host", socket.gethostbyname(config.pg_host)
+        )
+    replica_engine = create_replica_engine()
+    assert replica_engine is not None
+
+    statements: list[str] = []
+
+    @event.listens_for(replica_engine.sync_engine, "before_cursor_execute")
+    def record(
+        _conn: Connection, _cursor: object, statement: str, *_args: object
+    ) -> None:
+        statements.append(statement)
+
+    monkeypatch.setattr(
+        deps,
+        "replica_session",
+        async_sessionmaker(
+            bind=replica_engine, class_=AsyncSession, expire_on_commit=False
+        ),
+    )
+    yield statements
+
+    await replica_engine.dispose()
+
+
+async def test_reads_use_the_replica(
+    client: AsyncClient,
+    user: dict[str, str],
+    headers: dict[str, str],
+    task: dict[str, Any],
+    replica_statements: list[str],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # Past the time the task's writer stays on the primary
+    recent_writers.invalidate(uuid.UUID(user["id"]))
+
+    with assert_num_queries(2):
+        response = await client.get("/tasks/", headers=headers)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [task["id"]]
+    assert len(replica_statements) == 2
+
+
+async def test_reads_after_a_write_stay_on_the_primary(
+    client: AsyncClient, headers: dict[str, str], replica_statements: list[str]
+) -> None:
+    response = await client.post("/tasks/", json={"title": "Task"}, headers=headers)
+    task = response.json()
+
+    # Read back before the replica might have caught up
+    response = await client.get("/tasks/", headers=headers)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [task["id"]]
+    assert replica_statements == []
+
+
+async def test_reads_use_the_primary_without_a_replica(
+    client: AsyncClient,
+    headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    monkeypatch.setattr(config, "pg_replica_host", None)
+    assert create_replica_engine() is None
+    monkeypatch.setattr(deps, "replica_session", None)
+
+    with assert_num_queries(2):
+        response = await client.get("/tasks/", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,121 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from sqlmodel import insert
+
+from app.core.db import engine
+from app.core.notifications import CHANGES_CHANNEL, change_listener
+from app.models import Task
+from tests.conftest import AssertNumQueries
+
+pytestmark = pytest.mark.anyio
+
+
+def task_ids(tasks: list[dict[str, Any]]) -> set[str]:
+    return {task["id"] for task in tasks}
+
+
+async def test_repeated_read_is_served_from_cache(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    response = await client.get("/tasks/", headers=headers)
+    assert task_ids(response.json()) == {task["id"]}
+
+    with assert_num_queries(0):
+        cached = await client.get("/tasks/", headers=headers)
+
+    assert cached.status_code == 200
+    assert cached.content == response.content
+    assert cached.headers["ETag"] == response.headers["ETag"]
+
+    # Other query parameters are cached apart
+    with assert_num_queries(2):
+        response = await client.get("/tasks/", params={"limit": 1}, headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.usefixtures("task")
+async def test_cached_read_is_not_modified(
+    client: AsyncClient, headers: dict[str, str], assert_num_queries: AssertNumQueries
+) -> None:
+    response = await client.get("/tasks/", headers=headers)
+    etag = response.headers["ETag"]
+
+    with assert_num_queries(0):
+        response = await client.get(
+            "/tasks/", headers=headers | {"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+async def test_write_invalidates_the_cached_reads(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    response = await client.get("/tasks/", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = await client.post("/tasks/", json={"title": "New"}, headers=headers)
+    new_task = response.json()
+
+    with assert_num_queries(2):
+        response = await client.get(
+            "/tasks/", headers=headers | {"If-None-Match": etag}
+        )
+
+    assert response.status_code == 200
+    assert task_ids(response.json()) == {task["id"], new_task["id"]}
+
+
+async def test_notification_invalidates_the_cached_reads(
+    client: AsyncClient,
+    user: dict[str, str],
+    headers: dict[str, str],
+    task: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    await client.get("/tasks/", headers=headers)
+
+    # Written by another worker, whose commit this worker's cache never saw
+    owner_id = uuid.UUID(user["id"])
+    now = datetime.now(UTC)
+    new_task = Task(title="New", owner_id=owner_id, created_at=now, updated_at=now)
+    async with engine.begin() as connection:
+        await connection.execute(insert(Task).values(new_task.model_dump()))
+
+    with assert_num_queries(0):
+        response = await client.get("/tasks/", headers=headers)
+    assert task_ids(response.json()) == {task["id"]}
+
+    change_listener.on_notification(None, 0, CHANGES_CHANNEL, str(owner_id))  # ty:ignore[invalid-argument-type]
+
+    with assert_num_queries(2):
+        response = await client.get("/tasks/", headers=headers)
+    assert task_ids(response.json()) == {task["id"], str(new_task.id)}
+
+
+async def test_cached_reads_are_per_owner(
+    client: AsyncClient,
+    headers: dict[str, str],
+    other_headers: dict[str, str],
+    task: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    response = await client.get("/tasks/", headers=headers)
+    assert task_ids(response.json()) == {task["id"]}
+
+    with assert_num_queries(2):
+        response = await client.get("/tasks/", headers=other_headers)
+
+    assert response.status_code == 200
+    assert response.json() == []
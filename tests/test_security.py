@@ -0,0 +1,25 @@
+import asyncio
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.security import PasswordHashExecutor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_password_hash_executor_queue_metrics() -> None:
+    executor = PasswordHashExecutor(max_workers=1)
+    release = threading.Event()
+
+    jobs = [asyncio.create_task(executor.run(release.wait)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 3
+    assert REGISTRY.get_sample_value("password_hash_waiting") == 2
+
+    release.set()
+    await asyncio.gather(*jobs)
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 0
+    assert REGISTRY.get_sample_value("password_hash_waiting") == 0
+    executor.shutdown()
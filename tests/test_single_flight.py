@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from anyio import fail_after, wait_all_tasks_blocked
+from fastapi import Response
+
+from app.core.single_flight import SingleFlight, coalesce
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_followers_get_the_leader_result() -> None:
+    flights: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def call() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    leader = asyncio.create_task(flights.do("key", call))
+    await wait_all_tasks_blocked()
+    followers = [asyncio.create_task(flights.do("key", call)) for _ in range(2)]
+    await wait_all_tasks_blocked()
+
+    release.set()
+    assert await leader == (1, False)
+    assert await asyncio.gather(*followers) == [(1, True), (1, True)]
+    assert calls == 1
+    assert not flights.flights
+
+
+async def test_followers_get_the_leader_exception() -> None:
+    flights: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+    error = ValueError("failed")
+
+    async def call() -> int:
+        await release.wait()
+        raise error
+
+    callers = [asyncio.create_task(flights.do("key", call)) for _ in range(3)]
+    await wait_all_tasks_blocked()
+
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(result is error for result in results)
+    assert not flights.flights
+
+
+async def test_a_follower_takes_over_a_cancelled_leader() -> None:
+    flights: SingleFlight[str, str] = SingleFlight()
+    taken_over, release = asyncio.Event(), asyncio.Event()
+
+    async def leader_call() -> str:
+        await asyncio.Event().wait()
+        return "leader"
+
+    async def follower_call() -> str:
+        taken_over.set()
+        await release.wait()
+        return "follower"
+
+    leader = asyncio.create_task(flights.do("key", leader_call))
+    await wait_all_tasks_blocked()
+    follower = asyncio.create_task(flights.do("key", follower_call))
+    await wait_all_tasks_blocked()
+    assert not taken_over.is_set()
+
+    leader.cancel()
+    with fail_after(1):
+        await taken_over.wait()
+    # The follower is in flight with its own call now
+    assert "key" in flights.flights
+
+    release.set()
+    assert await follower == ("follower", False)
+    assert leader.cancelled()
+    assert not flights.flights
+
+
+async def test_a_cancelled_follower_leaves_the_leader_running() -> None:
+    flights: SingleFlight[str, str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def call() -> str:
+        await release.wait()
+        return "leader"
+
+    leader = asyncio.create_task(flights.do("key", call))
+    await wait_all_tasks_blocked()
+    follower = asyncio.create_task(flights.do("key", call))
+    await wait_all_tasks_blocked()
+
+    follower.cancel()
+    await wait_all_tasks_blocked()
+    release.set()
+    assert await leader == ("leader", False)
+    assert follower.cancelled()
+
+
+async def test_coalesced_callers_get_their_own_response() -> None:
+    release = asyncio.Event()
+    calls = 0
+
+    @coalesce
+    async def endpoint(*, current_user: SimpleNamespace, q: str) -> Response:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return Response(content=f"{current_user.id}/{q}", headers={"X-Shared": "1"})
+
+    user = SimpleNamespace(id=uuid.uuid4())
+    callers = [
+        asyncio.ensure_future(endpoint(current_user=user, q="tasks")) for _ in range(3)
+    ]
+    await wait_all_tasks_blocked()
+
+    release.set()
+    responses = await asyncio.gather(*callers)
+    assert calls == 1
+    assert len({id(response) for response in responses}) == 3
+
+    # Like a middleware adding its headers to the response it sends
+    for n, response in enumerate(responses):
+        response.headers[f"X-Caller-{n}"] = "1"
+    for n, response in enumerate(responses):
+        assert [name for name in response.headers if name.startswith("x-caller")] == [
+            f"x-caller-{n}"
+        ]
+        assert response.headers["X-Shared"] == "1"
+        assert response.body == f"{user.id}/tasks".encode()
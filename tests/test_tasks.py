@@ -0,0 +1,473 @@
+import base64
+import json
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, time
+from typing import Any
+
+import anyio
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import config
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from tests.conftest import AssertNumQueries
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_read_tasks(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    response = await client.post("/tasks/", json={"title": "Other"}, headers=headers)
+    other = response.json()
+
+    # The ETag's count and last update, and the page, with no relationships
+    with assert_num_queries(2):
+        response = await client.get("/tasks/", headers=headers)
+
+    assert response.status_code == 200
+    assert {item["id"] for item in response.json()} == {task["id"], other["id"]}
+
+
+def today_at_noon() -> str:
+    return datetime.combine(datetime.now(UTC).date(), time(12), UTC).isoformat()
+
+
+@pytest.mark.parametrize(
+    ("route", "due_date"),
+    [
+        ("/tasks/", None),
+        ("/tasks/upcomming", "2099-01-01T00:00:00Z"),
+        ("/tasks/today", today_at_noon()),
+        ("/tasks/overdue", "2020-01-01T00:00:00Z"),
+    ],
+)
+async def test_read_tasks_pages(
+    client: AsyncClient, headers: dict[str, str], route: str, due_date: str | None
+) -> None:
+    # One import batch stamps every task with the same `created_at`, so the
+    # pages are ordered by id alone
+    titles = [f"Task {n}" for n in range(5)]
+    response = await client.post(
+        "/tasks/import",
+        content="\n".join(
+            json.dumps({"title": title, "due_date": due_date}) for title in titles
+        ),
+        headers=headers,
+    )
+    assert response.json()["imported"] == len(titles)
+
+    pages: list[list[dict[str, Any]]] = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get(route, params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+    # The last page, shorter than the limit, has no cursor
+    assert [len(page) for page in pages] == [2, 2, 1]
+    tasks = [task for page in pages for task in page]
+    ids = [uuid.UUID(task["id"]) for task in tasks]
+    assert ids == sorted(set(ids))
+    assert sorted(task["title"] for task in tasks) == titles
+
+
+@pytest.mark.parametrize(
+    "route", ["/tasks/", "/tasks/upcomming", "/tasks/today", "/tasks/overdue"]
+)
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        encode_cursor(datetime.now(UTC), uuid.uuid4())[:-4],
+        base64.urlsafe_b64encode(b'["2020-01-01T00:00:00Z","not-an-id"]').decode(),
+        base64.urlsafe_b64encode(b'{"sort_value":1}').decode(),
+    ],
+)
+async def test_read_tasks_invalid_cursor(
+    client: AsyncClient, headers: dict[str, str], route: str, cursor: str
+) -> None:
+    response = await client.get(route, params={"cursor": cursor}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_read_task(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    project: dict[str, Any],
+    label: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # The task joined with its project, and a selectin load of its labels
+    with assert_num_queries(2):
+        response = await client.get(f"/tasks/{task['id']}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["project"]["id"] == project["id"]
+    assert [item["id"] for item in response.json()["labels"]] == [label["id"]]
+
+
+async def test_assign_label_to_task(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    label: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    response = await client.post(
+        "/tasks/", json={"title": "Task", "project_id": project["id"]}, headers=headers
+    )
+    task = response.json()
+
+    # The link insert, the NOTIFY of the commit, and the task with its labels
+    with assert_num_queries(3):
+        response = await client.post(
+            f"/tasks/{task['id']}/labels/{label['id']}", headers=headers
+        )
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["labels"]] == [label["id"]]
+
+
+async def test_delete_task(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # The delete with its tombstone, and the NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.delete(f"/tasks/{task['id']}", headers=headers)
+
+    assert response.status_code == 204
+
+
+async def test_create_task(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # INSERT ... RETURNING, and the NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.post(
+            "/tasks/",
+            json={"title": "Task", "project_id": project["id"]},
+            headers=headers,
+        )
+
+    assert response.status_code == 201
+    assert response.json()["project_id"] == project["id"]
+
+
+async def test_update_task(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # UPDATE ... RETURNING, a selectin load of the project, and the NOTIFY
+    with assert_num_queries(3):
+        response = await client.patch(
+            f"/tasks/{task['id']}", json={"title": "Renamed"}, headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert response.json()["project"]["id"] == project["id"]
+
+
+async def test_update_task_without_project(
+    client: AsyncClient, headers: dict[str, str], assert_num_queries: AssertNumQueries
+) -> None:
+    response = await client.post("/tasks/", json={"title": "Task"}, headers=headers)
+    task = response.json()
+
+    with assert_num_queries(2):
+        response = await client.patch(
+            f"/tasks/{task['id']}", json={"title": "Renamed"}, headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["project"] is None
+
+
+async def test_create_task_copy(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    # INSERT ... SELECT ... RETURNING, and the NOTIFY of the commit
+    with assert_num_queries(2):
+        response = await client.post(f"/tasks/{task['id']}/duplicate", headers=headers)
+
+    assert response.status_code == 201
+    assert response.json()["id"] != task["id"]
+    assert response.json()["title"] == f"{task['title']} (Copy)"
+
+
+async def test_assign_task_to_project(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    response = await client.post("/tasks/", json={"title": "Task"}, headers=headers)
+    task = response.json()
+
+    # The UPDATE guarded by the project's owner, its project, and the NOTIFY
+    with assert_num_queries(3):
+        response = await client.patch(
+            f"/tasks/{task['id']}/projects/{project['id']}", headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["project"]["id"] == project["id"]
+
+
+async def test_remove_task_from_project(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    with assert_num_queries(2):
+        response = await client.delete(
+            f"/tasks/{task['id']}/projects/{project['id']}", headers=headers
+        )
+
+    assert response.status_code == 204
+
+
+@pytest.mark.parametrize(
+    ("missing", "detail"),
+    [("task", "Task not found"), ("project", "Project not found")],
+)
+@pytest.mark.parametrize("route", ["/tasks/{task_id}", "/tasks/{task_id}/projects"])
+async def test_update_task_not_found(
+    client: AsyncClient,
+    headers: dict[str, str],
+    task: dict[str, Any],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+    missing: str,
+    detail: str,
+    route: str,
+) -> None:
+    task_id = str(uuid.uuid4()) if missing == "task" else task["id"]
+    project_id = str(uuid.uuid4()) if missing == "project" else project["id"]
+
+    # The UPDATE that matched no row, and the lookup picking the 404
+    with assert_num_queries(2):
+        if route == "/tasks/{task_id}":
+            response = await client.patch(
+                f"/tasks/{task_id}", json={"project_id": project_id}, headers=headers
+            )
+        else:
+            response = await client.patch(
+                f"/tasks/{task_id}/projects/{project_id}", headers=headers
+            )
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == detail
+
+
+async def test_read_changes_syncs_label_links(
+    client: AsyncClient,
+    headers: dict[str, str],
+    label: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(config, "tasks_changes_lag_seconds", 0)
+    response = await client.post("/tasks/", json={"title": "Task"}, headers=headers)
+    task = response.json()
+    response = await client.get("/tasks/changes", headers=headers)
+    since = response.json()["next_cursor"]
+
+    for method, label_ids in [("POST", [label["id"]]), ("DELETE", [])]:
+        response = await client.request(
+            method, f"/tasks/{task['id']}/labels/{label['id']}", headers=headers
+        )
+        response.raise_for_status()
+
+        # A page of each feed, and the label links of the tasks in it
+        with assert_num_queries(5):
+            response = await client.get(
+                "/tasks/changes", params={"since": since}, headers=headers
+            )
+
+        assert [item["id"] for item in response.json()["tasks"]] == [task["id"]]
+        assert response.json()["tasks"][0]["label_ids"] == label_ids
+        since = response.json()["next_cursor"]
+
+
+async def test_import_tasks_with_past_due_dates(
+    client: AsyncClient, headers: dict[str, str], label: dict[str, Any]
+) -> None:
+    records = [
+        {"title": "Overdue", "due_date": "2020-01-01T00:00:00Z"},
+        {
+            "title": "Done",
+            "completed": True,
+            "due_date": "2020-01-01T00:00:00Z",
+            "label_ids": [label["id"]],
+        },
+    ]
+
+    response = await client.post(
+        "/tasks/import",
+        content="\n".join(json.dumps(record) for record in records),
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+
+
+async def test_read_changes_during_a_slow_import(
+    client: AsyncClient, headers: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lag = 0.2
+    monkeypatch.setattr(config, "tasks_changes_lag_seconds", lag)
+    monkeypatch.setattr(config, "tasks_import_batch_size", 1)
+    first_copied, resume = anyio.Event(), anyio.Event()
+
+    async def records() -> AsyncIterator[bytes]:
+        yield b'{"title": "First"}\n'
+        # Asked for more once the first batch is copied
+        first_copied.set()
+        await resume.wait()
+        yield b'{"title": "Second"}\n'
+
+    async def import_tasks() -> None:
+        response = await client.post(
+            "/tasks/import", content=records(), headers=headers
+        )
+        assert response.json()["imported"] == 2
+
+    titles: list[str] = []
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(import_tasks)
+        await first_copied.wait()
+        # The first task is now older than the lag, while the import goes on
+        await anyio.sleep(lag * 2)
+        response = await client.get("/tasks/changes", headers=headers)
+        titles += [task["title"] for task in response.json()["tasks"]]
+        since = response.json()["next_cursor"]
+        resume.set()
+
+    await anyio.sleep(lag * 2)
+    response = await client.get(
+        "/tasks/changes", params={"since": since}, headers=headers
+    )
+    titles += [task["title"] for task in response.json()["tasks"]]
+
+    assert sorted(set(titles)) == ["First", "Second"]
+
+
+async def test_create_tasks_bulk(
+    client: AsyncClient,
+    headers: dict[str, str],
+    project: dict[str, Any],
+    assert_num_queries: AssertNumQueries,
+) -> None:
+    items = [
+        {"title": "First", "project_id": project["id"]},
+        {"priority": 9},
+        # Naive due dates are taken as UTC
+        {"title": "Naive", "due_date": "2099-01-01T00:00:00"},
+        {"title": "Past", "due_date": "2020-01-01T00:00:00"},
+        {"title": "Foreign", "project_id": str(uuid.uuid4())},
+        {"title": "Last"},
+    ]
+
+    # The project lookup, one multi-row INSERT ... RETURNING, and the NOTIFY
+    with assert_num_queries(3):
+        response = await client.post("/tasks/bulk", json=items, headers=headers)
+
+    assert response.status_code == 200
+    created = response.json()["created"]
+    assert [task["title"] for task in created] == ["First", "Naive", "Last"]
+    assert created[0]["project_id"] == project["id"]
+    assert created[1]["due_date"].startswith("2099-01-01T00:00:00")
+
+    errors = response.json()["errors"]
+    assert [error["index"] for error in errors] == [1, 3, 4]
+    assert {error["loc"][0] for error in errors[0]["detail"]} == {"title", "priority"}
+    assert (
+        errors[1]["detail"][0]["msg"] == "Value error, due_date must be in the future"
+    )
+    assert errors[2]["detail"] == "Project not found"
+
+
+async def test_create_tasks_bulk_all_invalid(
+    client: AsyncClient, headers: dict[str, str], assert_num_queries: AssertNumQueries
+) -> None:
+    with assert_num_queries(0):
+        response = await client.post(
+            "/tasks/bulk",
+            json=[{"title": "Past", "due_date": "2020-01-01"}],
+            headers=headers,
+        )
+
+    assert response.status_code == 200
+    assert response.json()["created"] == []
+    assert [error["index"] for error in response.json()["errors"]] == [0]
+
+
+@pytest.mark.parametrize("method", ["PATCH", "DELETE"])
+@pytest.mark.parametrize("task_filter", [{}, {"completed": None}])
+async def test_bulk_rejects_an_empty_filter(
+    client: AsyncClient,
+    headers: dict[str, str],
+    method: str,
+    task_filter: dict[str, Any],
+) -> None:
+    response = await client.request(
+        method,
+        "/tasks/bulk",
+        json={"filter": task_filter, "update": {"completed": True}},
+        headers=headers,
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("method", ["PATCH", "DELETE"])
+async def test_bulk_filter_over_the_limit(
+    client: AsyncClient,
+    headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+    method: str,
+) -> None:
+    monkeypatch.setattr(config, "tasks_bulk_max_items", 1)
+    for title in ["First", "Second"]:
+        response = await client.post("/tasks/", json={"title": title}, headers=headers)
+        response.raise_for_status()
+
+    body = {"filter": {"priority": 1}, "update": {"completed": True}}
+    response = await client.request(method, "/tasks/bulk", json=body, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "The filter matches more than 1 tasks"
+
+    # Nothing was changed
+    response = await client.get("/tasks/", headers=headers)
+    assert [item["completed"] for item in response.json()] == [False, False]
+
+    monkeypatch.setattr(config, "tasks_bulk_max_items", 2)
+    response = await client.request(method, "/tasks/bulk", json=body, headers=headers)
+    assert response.status_code == 200